@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+저장된 분석 결과/블로그 포스트를 JSON으로 제공하는 읽기 전용 HTTP 서버
+
+Streamlit 앱과 같은 data/reviews.db를 읽기 전용 연결 풀로 열고,
+직렬화한 응답을 메모리에 캐시해 ETag(If-None-Match)와 gzip으로 제공합니다.
+DB가 다른 프로세스에서 변경되면(PRAGMA data_version) 캐시를 비웁니다.
+
+사용 예:
+    python api_server.py --port 8502
+    curl http://127.0.0.1:8502/products/하림%20닭가슴살/analysis
+    curl http://127.0.0.1:8502/products/하림%20닭가슴살/posts?limit=20
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+DEFAULT_DB_PATH = os.path.join(os.getcwd(), "data", "reviews.db")
+GZIP_MIN_BYTES = 512
+MAX_POST_LIMIT = 100
+CACHE_MAX_ENTRIES = 512  # 캐시할 응답 수 (제품 × limit 조합이 많아도 메모리가 늘지 않도록 LRU로 제한)
+
+
+class ReadOnlyPool:
+    """
+    읽기 전용 SQLite 연결 풀
+
+    PRAGMA data_version 값은 같은 연결에서만 비교할 수 있으므로
+    변경 감지는 별도의 감시용 연결 하나로 수행함
+    """
+
+    def __init__(self, db_path, size=4):
+        self._connections = queue.Queue()
+        for _ in range(size):
+            self._connections.put(self._connect(db_path))
+        self._watcher = self._connect(db_path)
+        self._watcher_lock = threading.Lock()
+        self._version = self._data_version()
+
+    @staticmethod
+    def _connect(db_path):
+        return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+
+    def _data_version(self):
+        return self._watcher.execute("PRAGMA data_version").fetchone()[0]
+
+    def data_changed(self):
+        """마지막 확인 이후 다른 연결(앱)이 DB에 쓰기를 커밋했는지 여부"""
+        with self._watcher_lock:
+            version = self._data_version()
+            changed, self._version = version != self._version, version
+            return changed
+
+    @contextmanager
+    def connection(self):
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+
+def serialize(payload):
+    """JSON 본문, 본문 해시 ETag, (충분히 크면) gzip 본문을 한 번에 만들어 둠"""
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    compressed = gzip.compress(body, compresslevel=5) if len(body) >= GZIP_MIN_BYTES else None
+    return etag, body, compressed
+
+
+def gzip_etag(etag):
+    """gzip 본문용 ETag (강한 검증자는 콘텐츠 인코딩마다 달라야 함)"""
+    return etag[:-1] + '-gz"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match 헤더(목록, *, W/ 약한 검증자 포함)가 etag와 일치하는지 (약한 비교)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    경로별 직렬화된 응답 (ETag, 본문, gzip 본문) LRU 캐시
+    비울 때마다 세대(generation)가 바뀌며, 이전 세대에 읽은 데이터는 저장하지 않음
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, payload, generation):
+        entry = serialize(payload)
+        with self._lock:
+            if generation == self.generation:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+
+def fetch_analysis(conn, product_name):
+    row = conn.execute("""
+    SELECT positive_opinions, negative_opinions, summary, created_at
+    FROM analysis_results
+    WHERE product_name = ?
+    ORDER BY id DESC
+    LIMIT 1
+    """, (product_name,)).fetchone()
+    if row is None:
+        return None
+    return {
+        "product_name": product_name,
+        "positive": row[0],
+        "negative": row[1],
+        "summary": row[2],
+        "created_at": row[3],
+    }
+
+
+def fetch_posts(conn, product_name, limit):
+    rows = conn.execute("""
+    SELECT title, description, blogger_name, post_date, link
+    FROM blog_posts
+    WHERE product_name = ?
+    ORDER BY fused_rank IS NULL, fused_rank, id
+    LIMIT ?
+    """, (product_name, limit)).fetchall()
+    if not rows:
+        return None
+    return {
+        "product_name": product_name,
+        "posts": [
+            {"title": r[0], "description": r[1], "blogger_name": r[2], "post_date": r[3], "link": r[4]}
+            for r in rows
+        ],
+    }
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    wbufsize = -1  # 헤더와 본문을 한 번에 전송 (나눠 쓰면 delayed ACK로 요청마다 ~40ms 지연)
+    pool = None
+    cache = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, entry):
+        """응답 전송 (클라이언트가 가진 표현과 ETag가 같으면 200 대신 304)"""
+        etag, body, compressed = entry
+        use_gzip = compressed is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        if use_gzip:
+            etag, body = gzip_etag(etag), compressed
+        if status == 200 and etag_matches(self.headers.get("If-None-Match"), etag):
+            status = 304
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if status == 304:
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, serialize({"error": message}))
+
+    def _route(self, conn, url):
+        """경로를 (캐시 키, 조회 함수)로 변환"""
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        if parts == ["health"]:
+            return ("health",), lambda: {"status": "ok"}
+        if len(parts) == 3 and parts[0] == "products":
+            product_name, resource = parts[1], parts[2]
+            if resource == "analysis":
+                return ("analysis", product_name), lambda: fetch_analysis(conn, product_name)
+            if resource == "posts":
+                try:
+                    limit = int(parse_qs(url.query).get("limit", [50])[0])
+                except ValueError:
+                    limit = 50
+                limit = max(1, min(limit, MAX_POST_LIMIT))
+                return ("posts", product_name, limit), lambda: fetch_posts(conn, product_name, limit)
+        return None, None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if self.pool.data_changed():
+            self.cache.clear()
+        generation = self.cache.generation
+
+        with self.pool.connection() as conn:
+            key, load = self._route(conn, url)
+            if key is None:
+                return self._error(404, "not found")
+
+            entry = self.cache.get(key)
+            if entry is None:
+                try:
+                    payload = load()
+                except sqlite3.Error as e:
+                    return self._error(503, f"database error: {e}")
+                if payload is None:
+                    return self._error(404, "no data for product")
+                entry = self.cache.put(key, payload, generation)
+
+        self._send(200, entry)
+
+
+def make_server(host, port, db_path, pool_size=4):
+    handler = type("ConfiguredApiHandler", (ApiHandler,), {
+        "pool": ReadOnlyPool(db_path, pool_size),
+        "cache": ResponseCache(),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리뷰 분석 결과 읽기 전용 JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="reviews.db 경로")
+    parser.add_argument("--pool-size", type=int, default=4, help="읽기 전용 연결 수")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.db, args.pool_size)
+    print(f"Serving {args.db} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+import json
+import re
+from itertools import islice
+
+from startup import lazy_import
+from compaction import compaction_stats, encode_posts, verbose_posts
+from bloggers import DOWNWEIGHT_REPUTATION, SKIP_REPUTATION, get_blogger_reputation
+
+# 측면(aspect)별 시드 키워드
+# 시드는 클러스터 중심의 초기값으로만 쓰이고, 실제 중심은 할당된 포스트로 다시 계산됨
+ASPECT_SEEDS = {
+    "배송": ["배송", "택배", "도착", "포장", "배달", "출고"],
+    "가격": ["가격", "가성비", "할인", "비싸", "저렴", "세일", "구매가"],
+    "맛": ["맛", "맛있", "식감", "간이", "짜다", "달다", "풍미", "냄새"],
+    "내구성": ["내구성", "튼튼", "고장", "망가", "오래", "파손", "견고"],
+    "디자인": ["디자인", "색상", "컬러", "외관", "예쁘", "이쁘", "모양"],
+    "사용감": ["사용감", "편하", "불편", "착용", "사이즈", "크기", "무게", "성능"],
+    "서비스": ["서비스", "고객센터", "교환", "환불", "문의", "응대", "as"],
+}
+
+OTHER_ASPECT = "기타"
+
+# numpy는 측면 인덱스를 처음 만들 때 불러옴
+np = lazy_import("numpy")
+
+_WORD_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+
+def _tokenize(text):
+    """
+    형태소 분석기 없이 쓰는 간단한 토크나이저
+    단어 내부의 글자 bigram과 단어 첫 글자(조사가 붙어도 유지되는 어근 앞부분)를 특징으로 사용
+    """
+    features = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        features.append("_" + word[0])
+        features.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return features
+
+
+def _tfidf_matrix(docs):
+    """문서 목록을 L2 정규화된 TF-IDF 행렬과 어휘 사전으로 변환"""
+    tokenized = [_tokenize(doc) for doc in docs]
+    vocab = {}
+    for tokens in tokenized:
+        for token in tokens:
+            vocab.setdefault(token, len(vocab))
+
+    # (문서, 특징) 좌표를 모아 한 번에 누적 (희소 COO 방식)
+    rows = np.fromiter(
+        (i for i, tokens in enumerate(tokenized) for _ in tokens), dtype=np.int64
+    )
+    cols = np.fromiter(
+        (vocab[token] for tokens in tokenized for token in tokens), dtype=np.int64
+    )
+    tf = np.zeros((len(docs), len(vocab)), dtype=np.float32)
+    np.add.at(tf, (rows, cols), 1.0)
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log((1 + len(docs)) / (1 + df)) + 1.0
+    tfidf = np.log1p(tf) * idf.astype(np.float32)
+    return _normalize_rows(tfidf), vocab, idf
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _seed_matrix(vocab, idf):
+    """시드 키워드를 TF-IDF 공간의 측면별 초기 중심으로 변환"""
+    seeds = np.zeros((len(ASPECT_SEEDS), len(vocab)), dtype=np.float32)
+    for a, keywords in enumerate(ASPECT_SEEDS.values()):
+        for keyword in keywords:
+            tokens = _tokenize(keyword)
+            # 두 글자 이상 키워드는 bigram만 사용 (첫 글자 특징은 '맛'처럼 한 글자 키워드용)
+            if len(tokens) > 1:
+                tokens = tokens[1:]
+            for token in tokens:
+                if token in vocab:
+                    seeds[a, vocab[token]] = idf[vocab[token]]
+    return _normalize_rows(seeds)
+
+
+def cluster_aspects(docs, min_similarity=0.1, iterations=2, top_k=3):
+    """
+    시드 기반 구면 k-means로 문서를 측면별로 묶음
+
+    반환값: 측면 이름 -> {"members": [문서 인덱스], "mentions": [문서 인덱스], "representatives": [문서 인덱스], "keywords": [특징]}
+    - members: 가장 유사한 측면 하나에만 배정된 문서 (대표 포스트 선택용)
+    - mentions: 해당 측면과의 유사도가 min_similarity 이상인 모든 문서 (언급 수 집계용, 여러 측면에 중복 가능)
+    어떤 측면과도 유사도가 min_similarity 미만인 문서는 '기타'로 분류됨
+    """
+    if not docs:
+        return {}
+
+    matrix, vocab, idf = _tfidf_matrix(docs)
+    seeds = _seed_matrix(vocab, idf)
+    centroids = seeds.copy()
+    aspect_names = list(ASPECT_SEEDS)
+
+    def assign():
+        similarity = matrix @ centroids.T
+        best = similarity.argmax(axis=1)
+        assigned = similarity[np.arange(len(docs)), best] >= min_similarity
+        return similarity, best, assigned
+
+    similarity, best, assigned = assign()
+    for _ in range(iterations):
+        # 할당된 문서의 평균으로 중심 갱신 (시드 방향은 유지해서 측면 의미가 흐려지지 않게 함)
+        for a in range(len(aspect_names)):
+            mask = assigned & (best == a)
+            if mask.any():
+                centroids[a] = matrix[mask].mean(axis=0) + seeds[a]
+        centroids = _normalize_rows(centroids)
+        similarity, best, assigned = assign()
+
+    inverse_vocab = np.array(list(vocab))
+    clusters = {}
+    for a, name in enumerate(aspect_names):
+        mentions = np.flatnonzero(similarity[:, a] >= min_similarity)
+        if not len(mentions):
+            continue
+        members = np.flatnonzero(assigned & (best == a))
+        if not len(members):
+            # 다른 측면에 더 가깝게 배정된 문서만 언급한 경우, 언급 문서 중에서 대표를 고름
+            members = mentions
+        order = members[np.argsort(-similarity[members, a])]
+        top_features = [
+            feature for feature in inverse_vocab[np.argsort(-centroids[a])[:10]]
+            if not feature.startswith("_")
+        ]
+        clusters[name] = {
+            "members": order.tolist(),
+            "mentions": mentions.tolist(),
+            "representatives": order[:top_k].tolist(),
+            "keywords": [str(feature) for feature in top_features[:5]],
+        }
+
+    others = np.flatnonzero(~assigned)
+    if len(others):
+        clusters[OTHER_ASPECT] = {
+            "members": others.tolist(),
+            "mentions": others.tolist(),
+            "representatives": others[:top_k].tolist(),
+            "keywords": [],
+        }
+    return clusters
+
+
+# 측면 인덱스 테이블 생성
+def init_aspect_table(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS aspect_index (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_name TEXT NOT NULL,
+        aspect TEXT NOT NULL,
+        post_count INTEGER NOT NULL,
+        post_ids TEXT,
+        representative_ids TEXT,
+        keywords TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_aspect_index_product ON aspect_index (product_name)"
+    )
+
+
+# 저장된 포스트로 측면 인덱스를 만들고 DB에 저장
+def build_aspect_index(conn, cursor, product_name, top_k=3):
+    """
+    대표 포스트는 측면과 가장 유사한 신뢰 포스트 후보(top_k의 2배) 중 검색 순위(fused_rank)가 높은 순으로 선택
+    """
+    cursor.execute("""
+    SELECT id, title, description, blogger_name, fused_rank
+    FROM blog_posts
+    WHERE product_name = ?
+    """, (product_name,))
+    rows = cursor.fetchall()
+
+    post_ids = [row[0] for row in rows]
+    docs = [f"{row[1]} {row[2] or ''}" for row in rows]
+    clusters = cluster_aspects(docs, top_k=top_k)
+
+    # 평판이 낮은 블로거의 포스트는 대표 포스트로 뽑지 않음
+    reputations = {}
+
+    def trusted(i):
+        blogger_name = rows[i][3]
+        if blogger_name not in reputations:
+            reputations[blogger_name] = get_blogger_reputation(cursor, blogger_name)
+        return reputations[blogger_name] >= SKIP_REPUTATION
+
+    def representatives(members):
+        candidates = list(islice(filter(trusted, members), top_k * 2))
+        candidates.sort(key=lambda i: rows[i][4] if rows[i][4] is not None else float("inf"))
+        return [post_ids[i] for i in candidates[:top_k]]
+
+    cursor.execute("DELETE FROM aspect_index WHERE product_name = ?", (product_name,))
+    index = []
+    for aspect, cluster in clusters.items():
+        entry = {
+            "aspect": aspect,
+            "post_count": len(cluster["mentions"]),
+            "post_ids": [post_ids[i] for i in cluster["mentions"]],
+            "representative_ids": representatives(cluster["members"]),
+            "keywords": cluster["keywords"],
+        }
+        cursor.execute('''
+        INSERT INTO aspect_index (product_name, aspect, post_count, post_ids, representative_ids, keywords)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            product_name,
+            aspect,
+            entry["post_count"],
+            json.dumps(entry["post_ids"]),
+            json.dumps(entry["representative_ids"]),
+            json.dumps(entry["keywords"], ensure_ascii=False),
+        ))
+        index.append(entry)
+
+    conn.commit()
+    return sorted(index, key=lambda entry: -entry["post_count"])
+
+
+# DB에서 측면 인덱스 가져오기
+def get_aspect_index(cursor, product_name):
+    cursor.execute("""
+    SELECT aspect, post_count, post_ids, representative_ids, keywords
+    FROM aspect_index
+    WHERE product_name = ?
+    ORDER BY post_count DESC
+    """, (product_name,))
+
+    return [
+        {
+            "aspect": row[0],
+            "post_count": row[1],
+            "post_ids": json.loads(row[2]),
+            "representative_ids": json.loads(row[3]),
+            "keywords": json.loads(row[4]),
+        }
+        for row in cursor.fetchall()
+    ]
+
+
+# 측면별 언급 수와 대표 포스트만으로 프롬프트용 텍스트 구성
+def build_aspect_prompt_text(cursor, aspect_index, compaction=None):
+    """
+    대표 포스트는 압축 단계(compaction)를 거쳐 인코딩됨
+    반환값: (프롬프트 텍스트, 압축 전후 토큰 통계)
+    """
+    representative_ids = [i for entry in aspect_index for i in entry["representative_ids"]]
+    if not representative_ids:
+        return "", compaction_stats("", "")
+
+    placeholders = ",".join("?" * len(representative_ids))
+    cursor.execute(f"""
+    SELECT id, title, description, blogger_name, post_date
+    FROM blog_posts
+    WHERE id IN ({placeholders})
+    """, representative_ids)
+    posts = {row[0]: row[1:] for row in cursor.fetchall()}
+
+    # 한 포스트가 여러 측면을 언급할 수 있으므로 전체 수는 중복 없이 계산
+    total = len({post_id for entry in aspect_index for post_id in entry["post_ids"]})
+    raw_sections, sections = [], []
+    for entry in aspect_index:
+        header = f"[{entry['aspect']}] 언급 포스트 {entry['post_count']}개 / 전체 {total}개"
+        if entry["keywords"]:
+            header += f" (주요 표현: {', '.join(entry['keywords'])})"
+        section_posts = []
+        for post_id in entry["representative_ids"]:
+            if post_id in posts:
+                title, description, blogger_name, post_date = posts[post_id]
+                reputation = get_blogger_reputation(cursor, blogger_name)
+                if reputation < DOWNWEIGHT_REPUTATION:
+                    blogger_name = f"{blogger_name} (광고 의심 블로거, 신뢰도 {reputation:.2f})"
+                section_posts.append((title, description, blogger_name, post_date))
+        raw_sections.append(f"{header}\n{verbose_posts(section_posts)}")
+        sections.append(f"{header}\n{encode_posts(section_posts, compaction)}")
+
+    text = "\n\n".join(sections)
+    return text, compaction_stats("\n\n".join(raw_sections), text)
@@ -1,13 +1,36 @@
 # -*- coding: utf-8 -*-
+import time
+_script_started = time.perf_counter()
+
 import streamlit as st
-import urllib.request
 import urllib.parse
 import json
-import pandas as pd
 from datetime import datetime
+from contextlib import contextmanager
 import sqlite3
 import os
-from openai import OpenAI
+import threading
+import queue
+import atexit
+import uuid
+
+from startup import lazy_import, record_timing, startup_report, timed
+from bloggers import init_blogger_tables, record_blogger_post
+from retention import init_retention, start_maintenance, touch_product, reset_database
+from prefetch import Prefetcher
+from sentiment import quick_sentiment
+from aspects import init_aspect_table, build_aspect_index, get_aspect_index, build_aspect_prompt_text
+from retrieval import HYBRID_SORT, init_retrieval, search_blog
+from history import (
+    ANALYSIS_SECTIONS, init_history, post_set_hash, save_analysis_run,
+    get_latest_analysis, get_analysis_history, diff_analyses
+)
+
+record_timing("모듈 import (streamlit 포함)", time.perf_counter() - _script_started)
+
+# 무거운 모듈은 실제로 사용할 때 import
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
 
 os.environ["LANGSMITH_TRACING"] = "true"  # 추적 활성화
 os.environ["LANGSMITH_ENDPOINT"] = "https://api.smith.langchain.com"  # 엔드포인트
@@ -26,40 +49,102 @@ st.set_page_config(
 
 # NaverApiClient 클래스 정의
 class NaverApiClient:
+    # 네이버 검색 API 일일 호출 한도
+    DAILY_QUOTA = 25000
+    # 연결을 유지해 둘 HTTP 세션 수 (동시 요청이 더 많으면 잠시 더 만들고 반납 시 닫음)
+    SESSION_POOL_SIZE = 4
+
     def __init__(self, client_id, client_secret):
         self.client_id = client_id
         self.client_secret = client_secret
-        self.base_url = "https://openapi.naver.com/v1/search/"
+        self.base_url = os.environ.get("NAVER_API_BASE_URL", "https://openapi.naver.com/v1/search/")
+        # requests.Session은 스레드 간 공유가 안전하지 않으므로 요청마다 하나씩 빌려 쓰고 반납
+        # (스크립트 실행 스레드는 재실행마다 바뀌므로 스레드가 아니라 프로세스 단위로 보관)
+        self._sessions = queue.LifoQueue(maxsize=self.SESSION_POOL_SIZE)
+
+        # 일일 호출량 (일반 검색과 미리 검색이 함께 사용)
+        self._quota_lock = threading.Lock()
+        self._quota_day = None
+        self.quota_used = 0
+
+    @contextmanager
+    def session(self):
+        """연결을 재사용하는 HTTP 세션을 하나 빌려 씀 (사용 중에는 다른 스레드와 공유하지 않음)"""
+        try:
+            session = self._sessions.get_nowait()
+        except queue.Empty:
+            session = requests.Session()
+            session.headers.update({
+                "X-Naver-Client-Id": self.client_id,
+                "X-Naver-Client-Secret": self.client_secret
+            })
+        try:
+            yield session
+        finally:
+            try:
+                self._sessions.put_nowait(session)
+            except queue.Full:
+                session.close()
+
+    def close(self):
+        """보관 중인 세션의 연결을 모두 닫음"""
+        while True:
+            try:
+                self._sessions.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def consume_quota(self):
+        """호출 1회를 오늘 사용량에 반영 (한도를 넘으면 False)"""
+        today = datetime.now().date()
+        with self._quota_lock:
+            if self._quota_day != today:
+                self._quota_day = today
+                self.quota_used = 0
+            if self.quota_used >= self.DAILY_QUOTA:
+                return False
+            self.quota_used += 1
+            return True
    
-    def get_data(self, media, count, query, start=1, sort="date"):
+    @staticmethod
+    def _report(errors, message):
+        """오류 메시지 표시 (errors 목록이 주어지면 대신 목록에 추가)"""
+        if errors is None:
+            st.error(message)
+        else:
+            errors.append(message)
+
+    def get_data(self, media, count, query, start=1, sort="date", errors=None):
         """
         네이버 API에서 데이터를 가져오는 메소드
+        errors 목록을 넘기면 오류를 화면에 출력하지 않고 목록에 추가 (작업 스레드용)
         """
+        if not self.consume_quota():
+            self._report(errors, "네이버 API 일일 호출 한도를 초과했습니다.")
+            return None
+
         encText = urllib.parse.quote(query)
         url = f"{self.base_url}{media}?sort={sort}&display={count}&start={start}&query={encText}"
        
-        request = urllib.request.Request(url)
-        request.add_header("X-Naver-Client-Id", self.client_id)
-        request.add_header("X-Naver-Client-Secret", self.client_secret)
-       
         try:
-            response = urllib.request.urlopen(request)
-            rescode = response.getcode()
+            with self.session() as session:
+                response = session.get(url, timeout=10)
+            rescode = response.status_code
            
             if(rescode==200):
-                response_body = response.read()
-                result = response_body.decode('utf-8')
+                response.encoding = 'utf-8'
+                result = response.text
                 return result
             else:
-                st.error(f"Error Code: {rescode}")
+                self._report(errors, f"Error Code: {rescode}")
                 return None
         except Exception as e:
-            st.error(f"Exception occurred: {e}")
+            self._report(errors, f"Exception occurred: {e}")
             return None
    
-    def get_blog(self, query, count=10, start=1, sort="date"):
+    def get_blog(self, query, count=10, start=1, sort="date", errors=None):
         """블로그 검색 결과를 가져오는 편의 메소드"""
-        return self.get_data("blog", count, query, start, sort)
+        return self.get_data("blog", count, query, start, sort, errors)
    
     def parse_json(self, data):
         """API 응답을 JSON으로 파싱하는 메소드"""
@@ -67,12 +152,30 @@ class NaverApiClient:
             return json.loads(data)
         return None
 
+# 프로세스 전체에서 재사용하는 API 클라이언트 (재실행/세션 간 공유)
+@st.cache_resource(show_spinner=False)
+def get_naver_client(client_id, client_secret):
+    with timed("네이버 클라이언트 생성"):
+        client = NaverApiClient(client_id, client_secret)
+        atexit.register(client.close)
+        return client
+
+# API 키별로 캐시되므로 최근 사용한 키 몇 개만 유지 (키가 바뀔 때마다 클라이언트가 쌓이지 않도록)
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_openai_client(api_key):
+    with timed("OpenAI 클라이언트 생성"):
+        from openai import OpenAI
+        return OpenAI(api_key=api_key)
+
+@st.cache_resource(show_spinner=False)
+def get_prefetcher():
+    return Prefetcher()
+
 # 데이터베이스 초기화 및 연결 함수
 def init_db():
     # 데이터베이스 디렉토리 확인 및 생성
     db_dir = os.path.join(os.getcwd(), "data")
-    if not os.path.exists(db_dir):
-        os.makedirs(db_dir)
+    os.makedirs(db_dir, exist_ok=True)
    
     db_path = os.path.join(db_dir, "reviews.db")
    
@@ -106,7 +209,17 @@ def init_db():
     )
     ''')
    
+    # 측면 인덱스 / 블로거 평판 테이블 생성
+    init_aspect_table(c)
+    init_blogger_tables(c)
+    init_retrieval(c)
+    init_history(c)
+
     conn.commit()
+
+    # 보존 정책 설정 및 백그라운드 정리 시작 (프로세스당 1회)
+    init_retention(conn)
+    start_maintenance(db_path)
     return conn, c
 
 # 블로그 데이터를 DB에 저장하는 함수
@@ -118,7 +231,7 @@ def save_blog_data_to_db(conn, cursor, blog_data, product_name):
     # 기존 데이터 삭제 (같은 제품명으로 검색한 경우)
     cursor.execute("DELETE FROM blog_posts WHERE product_name = ?", (product_name,))
    
-    # 새 데이터 삽입
+    # 새 데이터 삽입 (혼합 검색이면 융합 순위, 아니면 검색 결과 순서를 순위로 저장)
     count = 0
     for item in blog_data["items"]:
         # HTML 태그 제거
@@ -126,69 +239,58 @@ def save_blog_data_to_db(conn, cursor, blog_data, product_name):
         description = item["description"].replace("<b>", "").replace("</b>", "").replace("&quot;", '"')
        
         cursor.execute('''
-        INSERT INTO blog_posts (product_name, title, description, link, blogger_name, post_date)
-        VALUES (?, ?, ?, ?, ?, ?)
+        INSERT INTO blog_posts (product_name, title, description, link, blogger_name, post_date, fused_rank)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
         ''', (
             product_name,
             title,
             description,
             item.get("link", ""),
             item.get("bloggername", ""),
-            item.get("postdate", "")
+            item.get("postdate", ""),
+            item.get("fused_rank", count + 1)
         ))
+
+        # 블로거 평판 통계 갱신
+        record_blogger_post(
+            cursor,
+            product_name,
+            item.get("bloggername", ""),
+            item.get("link", ""),
+            f"{title} {description}",
+            item.get("postdate", "")
+        )
         count += 1
    
     conn.commit()
     st.success(f"{count}개의 블로그 포스트가 데이터베이스에 저장되었습니다.")
     return count
 
-# 데이터베이스에서 블로그 포스트 가져오기
-def get_blog_posts(cursor, product_name, limit=50):
-    cursor.execute("""
-    SELECT title, description, blogger_name, post_date, link
-    FROM blog_posts
-    WHERE product_name = ?
-    LIMIT ?
-    """, (product_name, limit))
-   
-    return cursor.fetchall()
-
-# 분석 결과를 데이터베이스에 저장
-def save_analysis_result(conn, cursor, product_name, positive, negative, summary):
-    # 기존 분석 삭제 (같은 제품명인 경우)
-    cursor.execute("DELETE FROM analysis_results WHERE product_name = ?", (product_name,))
-   
-    # 새 분석 결과 저장
-    cursor.execute('''
-    INSERT INTO analysis_results (product_name, positive_opinions, negative_opinions, summary)
-    VALUES (?, ?, ?, ?)
-    ''', (product_name, positive, negative, summary))
-   
-    conn.commit()
+# 검색 결과 저장 및 파생 데이터(측면 인덱스, 접근 기록) 갱신
+def ingest_blog_data(conn, cursor, blog_data, product_name):
+    count = save_blog_data_to_db(conn, cursor, blog_data, product_name)
+    if count:
+        build_aspect_index(conn, cursor, product_name)
+        touch_product(conn, cursor, product_name)
+    return count
 
-# 데이터베이스에서 분석 결과 가져오기
-def get_analysis_result(cursor, product_name):
-    cursor.execute("""
-    SELECT positive_opinions, negative_opinions, summary
-    FROM analysis_results
-    WHERE product_name = ?
-    """, (product_name,))
-   
-    return cursor.fetchone()
+# 미리 검색 작업 (API 호출만 수행, DB 저장은 검색 버튼을 눌렀을 때)
+# 결과는 (검색 결과, 오류 메시지 목록) - 실패한 미리 검색도 오류와 함께 넘겨 검색 버튼에서 다시 호출하지 않음
+def make_prefetch(naver_client, product_name, count, sort_option):
+    def fetch(cancelled):
+        parsed_data, errors = search_blog(naver_client, product_name, count, sort_option)
+        if cancelled.is_set():
+            return None
+        return parsed_data, errors
+    return fetch
 
 # ChatGPT API를 사용한 리뷰 분석 함수
 def analyze_reviews(api_key, reviews_text, product_name):
     if not api_key:
         st.error("OpenAI API 키가 필요합니다.")
-        return None, None, None
+        return None, None, None, None
    
     try:
-        # OpenAI 모듈 가져오기
-        import openai
-       
-        # API 키 설정
-        openai.api_key = api_key
-       
         # 리뷰 텍스트가 너무 긴 경우 줄이기
         max_chars = 15000
         if len(reviews_text) > max_chars:
@@ -203,6 +305,7 @@ def analyze_reviews(api_key, reviews_text, product_name):
             - 먼저 제공된 글이 광고성 콘텐츠인지 객관적으로 판단해주세요.
             - 판단 기준: 협찬/광고 문구 명시, 지나치게 긍정적인 어조, 구매 링크 다수 포함, 상품 홍보에 치중된 내용 등
             - 광고성 콘텐츠로 판단되면 해당 내용은 의견 분석에서 제외하거나 비중을 낮춰주세요.
+            - 작성자에 '광고 의심 블로거'로 표시된 포스트는 여러 제품에 협찬 리뷰를 올린 이력이 있으므로 비중을 낮춰주세요.
 
             2. 긍정적 의견 분석:
             - 실제 사용자가 직접 경험한 구체적인 장점을 중심으로 분석해주세요.
@@ -223,6 +326,9 @@ def analyze_reviews(api_key, reviews_text, product_name):
             - 제품의 주요 특징과 사용자 만족도를 객관적으로 평가해주세요.
             - 5-7줄로 간결하게 요약해주세요.
 
+            블로그 내용은 측면(배송, 가격, 맛 등)별로 묶여 있으며, 각 측면의 언급 포스트 수와 대표 포스트가 함께 제공됩니다.
+            '가장 자주 언급되는' 특징은 측면별 언급 포스트 수를 기준으로 판단해주세요.
+
             블로그 내용:
             {reviews_text}
 
@@ -235,11 +341,13 @@ def analyze_reviews(api_key, reviews_text, product_name):
             }}
             """
 
-        # API 호출
-        client = OpenAI(api_key=api_key)
+        # API 호출 (캐시된 클라이언트의 연결 재사용)
+        client = get_openai_client(api_key)
         
+        model = "gpt-4o-mini"
+        started = time.perf_counter()
         response = client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=model,
             messages=[
                 {"role": "system", "content": "당신은 제품 리뷰 분석 전문가입니다. 제공된 콘텐츠를 철저히 분석하여 광고성 글을 식별하고, 실제 사용자 경험에 기반한 정보를 추출하는 능력이 있습니다. 분석 시 객관적 근거를 바탕으로 추론하고, 긍정/부정 의견의 패턴을 파악하여 명확하게 구분합니다. 단순 요약이 아닌 심층적 분석을 제공하며, 신뢰할 수 있는 종합 평가를 제시합니다."},
                 {"role": "user", "content": prompt}
@@ -247,6 +355,7 @@ def analyze_reviews(api_key, reviews_text, product_name):
             temperature=0.2,
             max_tokens=2048
         )
+        llm_ms = (time.perf_counter() - started) * 1000
 
        
         # 결과 파싱
@@ -255,19 +364,87 @@ def analyze_reviews(api_key, reviews_text, product_name):
 
         if not content:
             st.error("ChatGPT 응답이 비어 있습니다.")
-            return None, None, None
+            return None, None, None, None
 
         try:
             result = json.loads(content)
-            return result["positive"], result["negative"], result["summary"]
+            # 분석 기록용 실행 정보 (모델, 토큰 사용량, 응답 시간)
+            usage = response.usage
+            run = {
+                "model": model,
+                "prompt_tokens": usage.prompt_tokens if usage else None,
+                "completion_tokens": usage.completion_tokens if usage else None,
+                "llm_ms": llm_ms,
+            }
+            return result["positive"], result["negative"], result["summary"], run
         except json.JSONDecodeError as e:
             st.error(f"JSON 파싱 오류 발생: {str(e)}")
             st.text_area("응답 원문 보기", content, height=300)
-            return None, None, None
+            return None, None, None, None
    
     except Exception as e:
         st.error(f"ChatGPT API 호출 중 오류 발생: {str(e)}")
-        return None, None, None
+        return None, None, None, None
+
+# 로컬 감성 미리보기 표시 함수
+def render_sentiment_preview(preview):
+    st.markdown("### ⚡ 빠른 감성 미리보기")
+    st.caption(f"저장된 포스트 {preview['post_count']}개를 감성 사전으로 즉시 분석한 결과입니다.")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("긍정", f"{preview['positive_ratio']:.0%}")
+    col2.metric("부정", f"{preview['negative_ratio']:.0%}")
+    col3.metric("중립", f"{preview['neutral_ratio']:.0%}")
+    col4.metric("광고 추정 비율", f"{preview['ad_share']:.0%}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**자주 나온 긍정 표현**")
+        st.markdown("\n".join(f"- {phrase} ({count})" for phrase, count in preview["top_positive"]) or "-")
+    with col2:
+        st.markdown("**자주 나온 부정 표현**")
+        st.markdown("\n".join(f"- {phrase} ({count})" for phrase, count in preview["top_negative"]) or "-")
+
+# 분석 기록 및 버전 비교 표시 함수 (저장된 결과만 사용하므로 API 호출 없음)
+def render_analysis_history(cursor, product_name):
+    history = get_analysis_history(cursor, product_name)
+    if len(history) < 2:
+        return
+
+    versions = {version["id"]: version for version in history}
+    labels = {
+        version["id"]: f"v{len(history) - i} · {version['created_at']}"
+        for i, version in enumerate(history)
+    }
+
+    with st.expander(f"📜 분석 기록 ({len(history)}개 버전)"):
+        table = "| 버전 | 모델 | 토큰 (입력/출력) | 프롬프트 구성(ms) | LLM 응답(ms) |\n|---|---|---:|---:|---:|\n"
+        table += "\n".join(
+            f"| {labels[version['id']]} | {version['model'] or '-'} "
+            f"| {version['prompt_tokens'] or '-'} / {version['completion_tokens'] or '-'} "
+            f"| {round(version['prompt_ms']) if version['prompt_ms'] is not None else '-'} "
+            f"| {round(version['llm_ms']) if version['llm_ms'] is not None else '-'} |"
+            for version in history
+        )
+        st.markdown(table)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            old_id = st.selectbox("이전 버전", list(versions), index=1, format_func=labels.get, key="history_old")
+        with col2:
+            new_id = st.selectbox("비교 버전", list(versions), index=0, format_func=labels.get, key="history_new")
+
+        diff = diff_analyses(versions[old_id], versions[new_id])
+        notes = {None: "포스트 변경 여부 알 수 없음", True: "분석 대상 포스트 변경됨", False: "같은 포스트로 분석"}
+        caption = f"{notes[diff['posts_changed']]} · 토큰 사용량 변화 {diff['token_delta']:+d}"
+        if diff["model_changed"]:
+            caption += f" · 모델 변경 ({versions[old_id]['model'] or '-'} → {versions[new_id]['model'] or '-'})"
+        st.caption(caption)
+        for key, label in ANALYSIS_SECTIONS:
+            section = diff["sections"][key]
+            st.markdown(f"**{label}** (유사도 {section['similarity']:.0%})")
+            lines = [f"- ➕ {sentence}" for sentence in section["added"]]
+            lines += [f"- ➖ {sentence}" for sentence in section["removed"]]
+            st.markdown("\n".join(lines) or "변경 없음")
 
 # 메인 애플리케이션 함수
 def main():
@@ -292,6 +469,17 @@ def main():
         # OpenAI API 설정
         st.subheader("OpenAI API")
         openai_api_key = st.text_input("OpenAI API 키", type="password")
+
+        # 프롬프트 압축 설정
+        st.subheader("프롬프트 압축")
+        compaction = {
+            "enabled": st.checkbox("잡음 제거 (이모지, 반복 문자, 인사말, 해시태그)", value=True),
+            "tabular": st.checkbox("표 형식 인코딩", value=True)
+        }
+
+        # 트래픽이 많을 때는 LLM 없이 로컬 감성 분석만 사용
+        st.subheader("분석 모드")
+        quick_mode = st.checkbox("빠른 분석 모드 (LLM 미사용)", value=False)
        
         st.markdown("---")
        
@@ -300,17 +488,19 @@ def main():
         reset_db_button = st.button("데이터베이스 초기화")
        
         if reset_db_button:
-            # 데이터베이스 파일 삭제
-            db_path = os.path.join(os.getcwd(), "data", "reviews.db")
-            if os.path.exists(db_path):
-                os.remove(db_path)
-                st.success("데이터베이스가 초기화되었습니다.")
+            # 파일을 지우지 않고 데이터만 비움 (다른 세션의 연결 유지)
+            reset_conn, _ = init_db()
+            reset_database(reset_conn)
+            reset_conn.close()
+            st.success("데이터베이스가 초기화되었습니다.")
    
     # 데이터베이스 연결
-    conn, cursor = init_db()
+    with timed("DB 연결 및 스키마 확인"):
+        conn, cursor = init_db()
    
     # 네이버 API 클라이언트 생성
-    naver_client = NaverApiClient(naver_client_id, naver_client_secret)
+    naver_client = get_naver_client(naver_client_id, naver_client_secret)
+    st.sidebar.caption(f"네이버 API 오늘 사용량: {naver_client.quota_used} / {NaverApiClient.DAILY_QUOTA}")
    
     
 # 제품명 입력 및 검색 설정
@@ -327,7 +517,7 @@ def main():
     with col2:
         sort_options = st.selectbox(
             "정렬",
-            options=[("최신순", "date"), ("정확도순", "sim")],
+            options=[("최신순", "date"), ("정확도순", "sim"), ("정확도+최신 혼합", HYBRID_SORT)],
             format_func=lambda x: x[0]
         )
         sort_option = sort_options[1]
@@ -339,21 +529,45 @@ def main():
             search_button = st.button("검색", type="primary")
         with analyze_col:
             analyze_button = st.button("분석")
+
+    # 입력이 멈추면 백그라운드에서 미리 검색 (입력값이 바뀔 때마다 한 번만 예약)
+    prefetcher = get_prefetcher()
+    session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+    search_key = (product_name, count, sort_option)
+    if not product_name:
+        prefetcher.cancel(session_id)
+    elif (
+        not search_button
+        and naver_client_id and naver_client_secret
+        and search_key != st.session_state.get("prefetch_key")
+        and product_name != st.session_state.get("current_product")
+    ):
+        prefetcher.schedule(session_id, search_key, make_prefetch(naver_client, *search_key))
+        st.session_state.prefetch_key = search_key
     
     # 검색 버튼 처리
     if search_button and product_name:
         if not naver_client_id or not naver_client_secret:
             st.error("네이버 API 키가 필요합니다.")
         else:
+            st.session_state.prefetch_key = search_key
             with st.spinner(f"'{product_name}'에 대한 네이버 블로그 검색 중..."):
-                # 네이버 블로그 검색
-                data = naver_client.get_blog(product_name, count, sort=sort_option)
-                parsed_data = naver_client.parse_json(data)
-            
+                # 미리 검색된 결과가 있으면 재사용 (진행 중이면 끝날 때까지 대기, 실패했으면 그 오류를 표시)
+                prefetched = prefetcher.take(search_key)
+                if prefetched is not None:
+                    parsed_data, errors = prefetched
+                    if parsed_data and parsed_data.get("items"):
+                        st.success(f"미리 검색된 {len(parsed_data['items'])}개의 블로그 포스트를 사용합니다.")
+                else:
+                    # 네이버 블로그 검색 (혼합 정렬이면 정확도순/최신순을 동시에 가져와 융합)
+                    parsed_data, errors = search_blog(naver_client, product_name, count, sort_option)
+                for error in errors:
+                    st.error(error)
+
                 if parsed_data and "items" in parsed_data and parsed_data["items"]:
-                    # 블로그 데이터를 DB에 저장
-                    save_blog_data_to_db(conn, cursor, parsed_data, product_name)
-                
+                    # 블로그 데이터를 DB에 저장하고 측면 인덱스 생성
+                    ingest_blog_data(conn, cursor, parsed_data, product_name)
+
                     # 검색 결과 표시
                     st.subheader(f"검색 결과 (총 {parsed_data['total']}개 중 {len(parsed_data['items'])}개 표시)")
                 
@@ -383,20 +597,42 @@ def main():
         # 분석 버튼을 클릭했음을 기록
         st.session_state.analyze_clicked = True
         
-        if not openai_api_key:
+        if not openai_api_key and not quick_mode:
             st.error("OpenAI API 키가 필요합니다.")
         else:
             st.markdown("---")
             st.subheader("리뷰 분석")
             st.markdown(f"**'{st.session_state.current_product}'** 에 대한 블로그 리뷰를 분석합니다.")
             st.markdown("---")
+
+            # 접근 시각은 분석/재분석을 실행할 때만 갱신 (다른 위젯 조작으로 인한 재실행마다 쓰기 트랜잭션이 생기지 않도록)
+            if analyze_button or st.session_state.get("reanalyze", False):
+                touch_product(conn, cursor, st.session_state.current_product)
+
+            # 측면별 언급 빈도 표시 (로컬 인덱스라 분석 전에 바로 확인 가능)
+            aspect_index = get_aspect_index(cursor, st.session_state.current_product)
+            if not aspect_index:
+                aspect_index = build_aspect_index(conn, cursor, st.session_state.current_product)
+            if aspect_index:
+                st.markdown("### 🧩 측면별 언급 빈도")
+                st.bar_chart(pd.DataFrame(
+                    {"언급 포스트 수": [entry["post_count"] for entry in aspect_index]},
+                    index=[entry["aspect"] for entry in aspect_index]
+                ))
             
             # 먼저 기존 분석 결과가 있는지 확인
-            existing_analysis = get_analysis_result(cursor, st.session_state.current_product)
+            existing_analysis = get_latest_analysis(cursor, st.session_state.current_product)
            
-            if existing_analysis and not st.session_state.get("reanalyze", False):
+            if quick_mode:
+                # 빠른 분석 모드: 로컬 감성 분석 결과만 표시
+                preview = quick_sentiment(cursor, st.session_state.current_product)
+                if preview:
+                    render_sentiment_preview(preview)
+                else:
+                    st.warning(f"'{st.session_state.current_product}'에 대한 블로그 포스트가 없습니다. 먼저 검색을 실행해주세요.")
+            elif existing_analysis and not st.session_state.get("reanalyze", False):
                 # 기존 분석 결과 표시
-                positive, negative, summary = existing_analysis
+                positive, negative, summary = existing_analysis["positive"], existing_analysis["negative"], existing_analysis["summary"]
                
                 # 분석 결과 표시
                 st.subheader("기존 분석 결과")
@@ -420,23 +656,40 @@ def main():
                     st.session_state["reanalyze"] = True
                     st.rerun()
             else:
+                # LLM 응답이 올 때까지 로컬 감성 미리보기 표시
+                preview_placeholder = st.empty()
+                preview = quick_sentiment(cursor, st.session_state.current_product)
+                if preview:
+                    with preview_placeholder.container():
+                        render_sentiment_preview(preview)
+
                 with st.spinner("리뷰 데이터 분석 중..."):
-                    # DB에서 블로그 포스트 가져오기
-                    blog_posts = get_blog_posts(cursor, st.session_state.current_product)
-                   
-                    if blog_posts:
-                        # 모든 블로그 포스트 내용 결합
-                        all_posts_text = "\n\n".join([
-                            f"제목: {post[0]}\n내용: {post[1]}\n작성자: {post[2]}\n날짜: {post[3]}"
-                            for post in blog_posts
-                        ])
+                    # 프롬프트는 측면별 대표 포스트로만 구성 (저장된 포스트가 없으면 대표 포스트도 없음)
+                    if any(entry["representative_ids"] for entry in aspect_index):
+                        # 측면별 대표 포스트와 언급 수만 결합 (압축 단계 적용)
+                        prompt_started = time.perf_counter()
+                        all_posts_text, token_stats = build_aspect_prompt_text(cursor, aspect_index, compaction)
+                        prompt_ms = (time.perf_counter() - prompt_started) * 1000
+                        # 분석에 쓴 포스트 집합 (LLM 응답을 기다리는 동안 다른 세션이 같은 제품을 다시 검색할 수 있으므로 미리 계산)
+                        posts_hash = post_set_hash(cursor, st.session_state.current_product)
+                        st.caption(
+                            f"프롬프트 압축: 약 {token_stats['raw_tokens']} → {token_stats['compact_tokens']} 토큰 "
+                            f"({token_stats['saved_tokens']} 토큰, {token_stats['saved_ratio']:.0%} 절감)"
+                        )
                        
                         # ChatGPT로 리뷰 분석
-                        positive, negative, summary = analyze_reviews(openai_api_key, all_posts_text, st.session_state.current_product)
+                        positive, negative, summary, run = analyze_reviews(openai_api_key, all_posts_text, st.session_state.current_product)
                        
                         if positive and negative and summary:
-                            # 분석 결과 DB에 저장
-                            save_analysis_result(conn, cursor, st.session_state.current_product, positive, negative, summary)
+                            # 미리보기를 LLM 결과로 교체
+                            preview_placeholder.empty()
+
+                            # 분석 결과를 새 버전으로 저장 (이전 결과는 기록으로 유지)
+                            save_analysis_run(conn, cursor, st.session_state.current_product, positive, negative, summary, {
+                                **run,
+                                "post_set_hash": posts_hash,
+                                "prompt_ms": prompt_ms,
+                            })
                            
                             # 분석 결과 표시
                             st.subheader("리뷰 분석 결과")
@@ -459,6 +712,9 @@ def main():
                             st.error("리뷰 분석 중 오류가 발생했습니다.")
                     else:
                         st.warning(f"'{st.session_state.current_product}'에 대한 블로그 포스트가 없습니다. 먼저 검색을 실행해주세요.")
+
+            # 저장된 분석 버전 비교 (API 호출 없음)
+            render_analysis_history(cursor, st.session_state.current_product)
    
     # 데이터베이스 연결 종료
     conn.close()
@@ -489,6 +745,13 @@ def main():
             </div>
             """, unsafe_allow_html=True)
 
+    # 시작/초기화 비용 보고 (pandas를 불러오지 않도록 마크다운 표로 출력)
+    with st.sidebar:
+        with st.expander("⏱️ 시작 시간"):
+            report = "| 항목 | 시간(ms) |\n|---|---:|\n"
+            report += "\n".join(f"| {row['항목']} | {row['시간(ms)']} |" for row in startup_report(_script_started))
+            st.markdown(report)
+
 # 애플리케이션 실행
 if __name__ == "__main__":
     # 세션 상태 초기화
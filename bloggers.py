@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+import re
+import sqlite3
+from datetime import datetime
+
+# 협찬/광고 관련 단어 (해시태그 보존 등 단어 단위 판단용)
+SPONSORED_KEYWORDS = ["협찬", "광고", "제공", "지원", "원고료", "체험단", "소정의", "업체로부터", "수수료"]
+
+# 협찬/광고 고지 문구 (단어만 있는 경우가 아니라 고지 형태로 쓰인 경우만 인정)
+_SPONSORED_PATTERN = re.compile(
+    r"#\s?(?:광고|협찬|체험단|제품제공|원고료)"
+    r"|(?:광고|협찬)\s?(?:입니다|이에요|예요|임|글|포스팅|게시물|리뷰|\s?(?:을|를)?\s?받)"
+    r"|(?:유료\s?광고|광고\s?포함|체험단)"
+    r"|(?:제품|업체|브랜드|무상)\S{0,3}\s?(?:을|를)?\s?(?:제공|지원)\s?받"
+    r"|(?:제공|지원)\s?받아\s?(?:작성|솔직)"
+    r"|원고료|소정의\s?(?:원고료|수수료|대가|제품|금액)|업체로부터"
+    r"|수수료를?\s?(?:제공\s?)?받"
+)
+# '광고 아님', '내돈내산 (광고X)', '협찬 받지 않은' 같은 부정 고지는 먼저 제거
+_NEGATED_SPONSORED_PATTERN = re.compile(
+    r"#?(?:광고|협찬)\s?(?:글|포스팅|게시물|리뷰)?\s?(?:이|은|는|가)?\s?(?:[xX×]|아님|아닙니다|아니에요|아닌|아니고|없음|0%)"
+    r"|(?:광고|협찬)\s?(?:을|를|은|는)?\s?(?:받지|받은\s?(?:게|것이)?)\s?(?:않|아니|없)\S*"
+    r"|(?:비|무|노)\s?(?:협찬|광고)"
+)
+
+# 이 점수 미만인 블로거의 포스트는 프롬프트에서 제외
+SKIP_REPUTATION = 0.3
+# 이 점수 미만인 블로거의 포스트는 프롬프트에 '광고 의심'으로 표시해 비중을 낮춤
+DOWNWEIGHT_REPUTATION = 0.6
+
+
+# 블로거 평판 테이블 생성
+def init_blogger_tables(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS bloggers (
+        blogger_name TEXT PRIMARY KEY,
+        post_count INTEGER NOT NULL DEFAULT 0,
+        sponsored_count INTEGER NOT NULL DEFAULT 0,
+        product_count INTEGER NOT NULL DEFAULT 0,
+        first_post_date TEXT,
+        last_post_date TEXT,
+        reputation REAL NOT NULL DEFAULT 1.0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    # 같은 포스트를 다시 검색해도 중복 집계되지 않도록 링크 기준으로 기록
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS blogger_posts (
+        link TEXT PRIMARY KEY,
+        blogger_name TEXT NOT NULL,
+        seen_at TIMESTAMP
+    )
+    ''')
+    # 기존 DB 호환 (보존 정책의 만료 기준 컬럼)
+    cursor.execute("PRAGMA table_info(blogger_posts)")
+    if "seen_at" not in [row[1] for row in cursor.fetchall()]:
+        try:
+            cursor.execute("ALTER TABLE blogger_posts ADD COLUMN seen_at TIMESTAMP")
+        except sqlite3.OperationalError as e:
+            # 동시에 연결한 다른 세션이 먼저 추가한 경우
+            if "duplicate column" not in str(e):
+                raise
+
+    # 블로거가 리뷰한 제품 목록 (제품 분산도 계산용)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS blogger_products (
+        blogger_name TEXT NOT NULL,
+        product_name TEXT NOT NULL,
+        PRIMARY KEY (blogger_name, product_name)
+    )
+    ''')
+
+
+def is_sponsored(text):
+    """협찬/광고 고지 문구가 있는지 확인 (부정 고지는 제외)"""
+    return bool(_SPONSORED_PATTERN.search(_NEGATED_SPONSORED_PATTERN.sub(" ", text or "")))
+
+
+def _parse_post_date(post_date):
+    try:
+        return datetime.strptime(post_date, "%Y%m%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def compute_reputation(post_count, sponsored_count, product_count, first_post_date, last_post_date):
+    """
+    블로거 평판 점수 (0~1, 높을수록 실제 사용자에 가까움)
+
+    - 협찬 문구 비율: 포스트 수가 적을 때 한두 건으로 점수가 급변하지 않도록 평활화
+    - 제품 분산도: 서로 다른 제품을 많이 리뷰할수록 체험단/원고 블로거일 가능성이 높음
+    - 포스팅 빈도: 하루 1건 이상 리뷰를 올리는 경우 감점 (포스트가 적으면 영향 축소)
+    """
+    sponsored_rate = (sponsored_count + 1) / (post_count + 5)
+    spread = min(1.0, max(0, product_count - 1) / 9)
+
+    first, last = _parse_post_date(first_post_date), _parse_post_date(last_post_date)
+    frequency = 0.0
+    if first and last:
+        span_days = (last - first).days + 1
+        frequency = min(1.0, post_count / span_days) * min(1.0, post_count / 5)
+
+    return round(1.0 - (0.6 * sponsored_rate + 0.25 * spread + 0.15 * frequency), 4)
+
+
+# 수집한 포스트 1건을 블로거 통계에 반영 (이미 집계된 링크는 무시)
+def record_blogger_post(cursor, product_name, blogger_name, link, text, post_date):
+    if not blogger_name:
+        return
+
+    cursor.execute(
+        "INSERT OR IGNORE INTO blogger_posts (link, blogger_name, seen_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
+        (link, blogger_name)
+    )
+    if cursor.rowcount == 0:
+        cursor.execute("UPDATE blogger_posts SET seen_at = CURRENT_TIMESTAMP WHERE link = ?", (link,))
+        return
+
+    cursor.execute(
+        "INSERT OR IGNORE INTO blogger_products (blogger_name, product_name) VALUES (?, ?)",
+        (blogger_name, product_name)
+    )
+    new_product = cursor.rowcount
+
+    cursor.execute('''
+    INSERT INTO bloggers (blogger_name, post_count, sponsored_count, product_count, first_post_date, last_post_date)
+    VALUES (?, 1, ?, ?, ?, ?)
+    ON CONFLICT(blogger_name) DO UPDATE SET
+        post_count = post_count + 1,
+        sponsored_count = sponsored_count + excluded.sponsored_count,
+        product_count = product_count + excluded.product_count,
+        first_post_date = MIN(COALESCE(first_post_date, excluded.first_post_date), excluded.first_post_date),
+        last_post_date = MAX(COALESCE(last_post_date, excluded.last_post_date), excluded.last_post_date),
+        updated_at = CURRENT_TIMESTAMP
+    ''', (blogger_name, int(is_sponsored(text)), new_product, post_date, post_date))
+
+    cursor.execute("""
+    SELECT post_count, sponsored_count, product_count, first_post_date, last_post_date
+    FROM bloggers
+    WHERE blogger_name = ?
+    """, (blogger_name,))
+    cursor.execute(
+        "UPDATE bloggers SET reputation = ? WHERE blogger_name = ?",
+        (compute_reputation(*cursor.fetchone()), blogger_name)
+    )
+
+
+# 블로거 평판 점수 조회 (기본키 조회 1회, 기록이 없으면 1.0)
+def get_blogger_reputation(cursor, blogger_name):
+    cursor.execute("SELECT reputation FROM bloggers WHERE blogger_name = ?", (blogger_name,))
+    row = cursor.fetchone()
+    return row[0] if row else 1.0
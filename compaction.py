@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import html
+import re
+
+from bloggers import SPONSORED_KEYWORDS
+
+# 압축 단계 기본 설정
+DEFAULT_COMPACTION = {
+    "enabled": True,
+    "strip_emoji": True,        # 이모지/장식 기호 제거
+    "collapse_repeats": True,   # ㅋㅋㅋㅋ, !!!! 같은 반복 축약
+    "strip_greetings": True,    # 인사말/맺음말 상투어 제거
+    "max_hashtags": 2,          # 포스트당 남길 해시태그 수 (협찬/광고 태그는 항상 유지)
+    "tabular": True,            # 포스트마다 필드명을 반복하지 않는 표 형식 사용
+}
+
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F000-\U0001FAFF"  # 이모지, 그림 문자
+    "\u2600-\u2604\u2607-\u27BF"  # 기타 기호, 딩뱃 (♡ ✔ 등, 별점 ★☆는 유지)
+    "\u2B00-\u2BFF"
+    "\uFE0F\u200D\u20E3"     # 이모지 변형 선택자 / 결합 문자
+    "]+"
+)
+_JAMO_REPEAT_PATTERN = re.compile(r"([ㄱ-ㅎㅏ-ㅣ])\1{2,}")
+_PUNCT_REPEAT_PATTERN = re.compile(r"([!?~^.,])\1+")
+_CHAR_REPEAT_PATTERN = re.compile(r"([^\W\d_])\1{3,}")  # 숫자(가격 등)는 축약하지 않음
+_HASHTAG_PATTERN = re.compile(r"#[^\s#]+")
+_SPACE_PATTERN = re.compile(r"\s+")
+_GREETING_PATTERNS = [
+    re.compile(r"안녕하세요[,\s]*(?:(?:[가-힣]{1,10}\s?)?(?:이웃님들?|여러분|블로그\s?친구들?|블친님들?))?[!~.,\s]*"),
+    re.compile(r"(?:오늘은|오늘도)\s[^.!?\n]{0,30}?(?:리뷰|후기|포스팅)(?:를|을)?\s?(?:해볼게요|해보려고\s?해요|가져왔어요|들고\s?왔어요|남겨볼게요)[!~.\s]*"),
+    re.compile(r"(?:공감|댓글|이웃\s?추가)[^.!?\n]{0,15}(?:부탁|환영)[가-힣]{0,6}[!~.\s]*"),
+]
+
+# 압축 전 형식 (포스트마다 필드명 반복)
+_VERBOSE_TEMPLATE = "제목: {0}\n내용: {1}\n작성자: {2}\n날짜: {3}"
+_TABLE_HEADER = "제목 | 내용 | 작성자 | 날짜"
+
+
+def compact_text(text, options=None):
+    """포스트 제목/본문에서 의견과 무관한 잡음을 제거"""
+    options = {**DEFAULT_COMPACTION, **(options or {})}
+    if not text or not options["enabled"]:
+        return text or ""
+
+    text = _TAG_PATTERN.sub("", html.unescape(text))
+    if options["strip_emoji"]:
+        text = _EMOJI_PATTERN.sub(" ", text)
+    if options["collapse_repeats"]:
+        text = _JAMO_REPEAT_PATTERN.sub(r"\1\1", text)
+        text = _PUNCT_REPEAT_PATTERN.sub(r"\1", text)
+        text = _CHAR_REPEAT_PATTERN.sub(r"\1\1", text)
+    if options["strip_greetings"]:
+        for pattern in _GREETING_PATTERNS:
+            text = pattern.sub(" ", text)
+
+    # 해시태그는 중복을 빼고 앞쪽 몇 개만 유지 (광고 판단에 쓰이는 협찬/광고 태그는 개수와 무관하게 유지)
+    kept, seen = [], set()
+    def keep_hashtag(match):
+        tag = match.group(0)
+        if tag in seen:
+            return " "
+        if any(keyword in tag for keyword in SPONSORED_KEYWORDS):
+            seen.add(tag)
+            return tag
+        if len(kept) >= options["max_hashtags"]:
+            return " "
+        kept.append(tag)
+        seen.add(tag)
+        return tag
+    text = _HASHTAG_PATTERN.sub(keep_hashtag, text)
+
+    return _SPACE_PATTERN.sub(" ", text).strip()
+
+
+def encode_posts(posts, options=None):
+    """
+    (제목, 내용, 작성자, 날짜) 목록을 프롬프트용 텍스트로 변환
+    표 형식에서는 필드명을 머리글에 한 번만 쓰고 포스트는 한 줄씩 기록
+    """
+    options = {**DEFAULT_COMPACTION, **(options or {})}
+    if not options["enabled"]:
+        return "\n\n".join(_VERBOSE_TEMPLATE.format(*post) for post in posts)
+
+    rows = [
+        (compact_text(title, options), compact_text(description, options), blogger_name or "", post_date or "")
+        for title, description, blogger_name, post_date in posts
+    ]
+
+    if options["tabular"]:
+        lines = [" | ".join(field.replace("|", "/") for field in row) for row in rows]
+        return "\n".join([_TABLE_HEADER] + lines)
+    return "\n\n".join(_VERBOSE_TEMPLATE.format(*row) for row in rows)
+
+
+def verbose_posts(posts):
+    """압축하지 않은 기존 형식 (절감량 계산 기준)"""
+    return "\n\n".join(_VERBOSE_TEMPLATE.format(*post) for post in posts)
+
+
+def estimate_tokens(text):
+    """
+    입력 토큰 수 추정
+    tiktoken이 설치되어 있으면 gpt-4o 토크나이저로 세고, 없으면 한글 1.5음절당 1토큰 / 그 외 4글자당 1토큰으로 근사
+    """
+    try:
+        import tiktoken
+        return len(tiktoken.get_encoding("o200k_base").encode(text))
+    except Exception:
+        hangul = sum(1 for ch in text if "가" <= ch <= "힣")
+        others = sum(1 for ch in text if not ch.isspace()) - hangul
+        return int(hangul / 1.5 + others / 4 + 0.5)
+
+
+def compaction_stats(raw_text, compacted_text):
+    """압축 전후 토큰 수와 절감량"""
+    raw_tokens = estimate_tokens(raw_text)
+    compact_tokens = estimate_tokens(compacted_text)
+    return {
+        "raw_tokens": raw_tokens,
+        "compact_tokens": compact_tokens,
+        "saved_tokens": raw_tokens - compact_tokens,
+        "saved_ratio": (raw_tokens - compact_tokens) / raw_tokens if raw_tokens else 0.0,
+    }
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import difflib
+import hashlib
+import re
+import sqlite3
+
+ANALYSIS_SECTIONS = [("positive", "긍정적 의견"), ("negative", "부정적 의견"), ("summary", "전체 요약")]
+
+# 분석 1회의 실행 정보 컬럼 (기존 DB에는 ALTER TABLE로 추가)
+_RUN_COLUMNS = {
+    "post_set_hash": "TEXT",        # 분석에 사용한 포스트 집합(link)의 해시
+    "model": "TEXT",
+    "prompt_tokens": "INTEGER",
+    "completion_tokens": "INTEGER",
+    "prompt_ms": "REAL",            # 프롬프트 구성 시간
+    "llm_ms": "REAL",               # LLM 응답 대기 시간
+}
+
+_VERSION_COLUMNS = ["id", "created_at", "positive_opinions", "negative_opinions", "summary"] + list(_RUN_COLUMNS)
+_SENTENCE_PATTERN = re.compile(r"\n+|(?<=[.!?])\s+")
+
+
+# 분석 기록 컬럼과 최신 분석 조회용 인덱스 생성
+def init_history(cursor):
+    cursor.execute("PRAGMA table_info(analysis_results)")
+    existing = {row[1] for row in cursor.fetchall()}
+    for column, column_type in _RUN_COLUMNS.items():
+        if column not in existing:
+            try:
+                cursor.execute(f"ALTER TABLE analysis_results ADD COLUMN {column} {column_type}")
+            except sqlite3.OperationalError as e:
+                # 동시에 연결한 다른 세션이 먼저 추가한 경우
+                if "duplicate column" not in str(e):
+                    raise
+    # (product_name, id) 인덱스로 제품별 최신 분석을 인덱스 끝에서 바로 읽음
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_analysis_results_product_id ON analysis_results (product_name, id)"
+    )
+
+
+def post_set_hash(cursor, product_name):
+    """제품에 저장된 포스트 집합(link)의 해시 (순서 무관)"""
+    cursor.execute("SELECT link FROM blog_posts WHERE product_name = ?", (product_name,))
+    links = sorted({row[0] or "" for row in cursor.fetchall()})
+    return hashlib.sha1("\n".join(links).encode("utf-8")).hexdigest()
+
+
+# 분석 결과를 새 버전으로 저장 (이전 버전은 유지)
+def save_analysis_run(conn, cursor, product_name, positive, negative, summary, run=None):
+    run = run or {}
+    cursor.execute(f'''
+    INSERT INTO analysis_results (product_name, positive_opinions, negative_opinions, summary, {", ".join(_RUN_COLUMNS)})
+    VALUES (?, ?, ?, ?, {", ".join("?" * len(_RUN_COLUMNS))})
+    ''', (product_name, positive, negative, summary, *(run.get(column) for column in _RUN_COLUMNS)))
+    conn.commit()
+    return cursor.lastrowid
+
+
+def _version(row):
+    keys = ["id", "created_at", "positive", "negative", "summary"] + list(_RUN_COLUMNS)
+    return dict(zip(keys, row))
+
+
+# 제품의 최신 분석 (인덱스 조회 1회)
+def get_latest_analysis(cursor, product_name):
+    cursor.execute(f"""
+    SELECT {", ".join(_VERSION_COLUMNS)}
+    FROM analysis_results
+    WHERE product_name = ?
+    ORDER BY id DESC
+    LIMIT 1
+    """, (product_name,))
+    row = cursor.fetchone()
+    return _version(row) if row else None
+
+
+# 제품의 분석 기록 (최신순)
+def get_analysis_history(cursor, product_name, limit=20):
+    cursor.execute(f"""
+    SELECT {", ".join(_VERSION_COLUMNS)}
+    FROM analysis_results
+    WHERE product_name = ?
+    ORDER BY id DESC
+    LIMIT ?
+    """, (product_name, limit))
+    return [_version(row) for row in cursor.fetchall()]
+
+
+def _sentences(text):
+    return [sentence.strip(" -•") for sentence in _SENTENCE_PATTERN.split(text or "") if sentence.strip(" -•")]
+
+
+def diff_analyses(old, new):
+    """
+    저장된 두 분석 버전 비교 (API 호출 없음)
+    섹션별로 문장 단위 추가/삭제 목록과, 포스트 집합/토큰 사용량 변화를 반환
+    """
+    sections = {}
+    for key, _ in ANALYSIS_SECTIONS:
+        old_sentences, new_sentences = _sentences(old[key]), _sentences(new[key])
+        matcher = difflib.SequenceMatcher(None, old_sentences, new_sentences, autojunk=False)
+        added, removed = [], []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag in ("replace", "delete"):
+                removed.extend(old_sentences[i1:i2])
+            if tag in ("replace", "insert"):
+                added.extend(new_sentences[j1:j2])
+        sections[key] = {"added": added, "removed": removed, "similarity": matcher.ratio()}
+
+    def tokens(version):
+        return (version["prompt_tokens"] or 0) + (version["completion_tokens"] or 0)
+
+    return {
+        "sections": sections,
+        # 실행 정보가 없는 이전 형식의 기록은 포스트 변경 여부를 알 수 없음 (None)
+        "posts_changed": None if None in (old["post_set_hash"], new["post_set_hash"])
+        else old["post_set_hash"] != new["post_set_hash"],
+        "model_changed": old["model"] != new["model"],
+        "token_delta": tokens(new) - tokens(old),
+    }
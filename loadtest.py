@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+"""
+Streamlit 앱 동시 세션 부하 테스트
+
+로컬 스텁 API(네이버 검색 / OpenAI)를 띄운 뒤 Streamlit의 AppTest로
+N개의 가상 세션이 검색 → 분석 → 재분석 흐름을 동시에 수행하도록 하고,
+단계별 p50/p95/p99 지연시간, 오류 수, DB 락 대기(SQLITE_BUSY 재시도) 횟수와 시간을 출력합니다.
+
+사용 예:
+    python loadtest.py --sessions 8 --workers 8
+    python loadtest.py --app naverblogads.py --sessions 8 --workers 8
+    python loadtest.py --sweep 1,2,4,8,16 --workers 8 --p95-limit 3.0
+"""
+import argparse
+import json
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APPS = ["blogads.py", "naverblogads.py"]
+# naverblogads.py는 API 키를 st.secrets에서 읽음 (스텁 서버는 값을 확인하지 않음)
+# AppTest.secrets는 실행마다 전역 st.secrets를 바꿨다 되돌려 동시 실행 시 서로 덮어쓰므로 파일로 제공
+APP_SECRETS = {
+    "NAVER_CLIENT_ID": "loadtest",
+    "NAVER_CLIENT_SECRET": "loadtest",
+    "OPENAI_API_KEY": "sk-loadtest",
+}
+TESTED_STREAMLIT = "1.66"  # 아래 Streamlit 내부 API 패치를 확인한 버전
+STAGES = ["search", "analyze", "reanalyze"]
+BUSY_RETRY_INTERVAL = 0.005  # 락 대기 중 재시도 간격 (초)
+
+# 현재 스레드가 실행 중인 단계의 (결과, 락) - 락 대기를 단계별로 집계하는 데 사용
+_stage_context = threading.local()
+
+SAMPLE_DESCRIPTIONS = [
+    "배송이 빨라서 좋았어요 포장도 꼼꼼했습니다",
+    "가격 대비 맛있어요 가성비 최고입니다",
+    "맛이 좀 짜서 아쉬웠어요",
+    "디자인이 예쁘고 색상도 마음에 들어요",
+    "택배 도착이 늦어서 불편했습니다",
+    "튼튼하고 오래 쓸 수 있을 것 같아요",
+    "업체로부터 제품을 제공받아 작성한 솔직 후기입니다",
+]
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    """네이버 블로그 검색과 OpenAI chat completions를 흉내내는 스텁 핸들러"""
+
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        query = params.get("query", [""])[0]
+        display = int(params.get("display", ["10"])[0])
+        items = [
+            {
+                "title": f"<b>{query}</b> 사용 후기 {i}",
+                "description": SAMPLE_DESCRIPTIONS[i % len(SAMPLE_DESCRIPTIONS)],
+                "link": f"https://blog.naver.com/stub{i % 13}/{i}",
+                "bloggername": f"블로거{i % 13}",
+                "postdate": f"2025{(i % 12) + 1:02d}{(i % 28) + 1:02d}",
+            }
+            for i in range(display)
+        ]
+        self._send_json({"total": display * 10, "start": 1, "display": display, "items": items})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(self.latency)
+        content = json.dumps({
+            "ad_analysis": "스텁 광고 분석",
+            "positive": "스텁 긍정 의견",
+            "negative": "스텁 부정 의견",
+            "summary": "스텁 종합 평가",
+        }, ensure_ascii=False)
+        prompt_chars = sum(len(m.get("content", "")) for m in request.get("messages", []))
+        self._send_json({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_chars,
+                "completion_tokens": len(content),
+                "total_tokens": prompt_chars + len(content),
+            },
+        })
+
+
+def start_stub_server(latency):
+    """스텁 API 서버를 백그라운드 스레드로 시작하고 (server, base_url) 반환"""
+    handler = type("ConfiguredStubApiHandler", (StubApiHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def percentile(values, pct):
+    """nearest-rank 백분위수 (값 20개의 p95는 19번째 값)"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def check_streamlit_internals():
+    """
+    부하 테스트가 패치하는 Streamlit 내부 API가 설치된 버전에 있는지 확인
+    (공개 API가 아니므로 버전이 바뀌면 없어질 수 있음)
+    """
+    import streamlit
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    required = [
+        (Runtime, "instance"),
+        (Runtime, "exists"),
+        (ScriptCache, "get_bytecode"),
+        (LocalScriptRunner, "_run_script_thread"),
+    ]
+    missing = [f"{cls.__name__}.{name}" for cls, name in required if not hasattr(cls, name)]
+    if missing:
+        raise SystemExit(
+            f"설치된 Streamlit {streamlit.__version__}에 부하 테스트가 사용하는 내부 API가 없습니다: "
+            f"{', '.join(missing)} (확인한 버전: {TESTED_STREAMLIT})"
+        )
+
+
+def share_streamlit_runtime():
+    """
+    AppTest는 실행마다 전역 Runtime을 새로 만들고 끝나면 지우기 때문에 동시에 실행하면 서로의 런타임을 없앰
+    실제 서버 프로세스처럼 모든 세션이 하나의 런타임과 스크립트 캐시를 공유하도록 패치
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit import config
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    shared_runtime = MagicMock(spec=Runtime)
+    shared_runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared_runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: shared_runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    # 파이썬 3.11의 ast.parse는 여러 스레드에서 동시에 호출하면 실패할 수 있어 컴파일을 한 번만 수행
+    shared_cache = ScriptCache()
+    compile_lock = threading.Lock()
+    get_bytecode = ScriptCache.get_bytecode
+
+    def shared_get_bytecode(self, script_path):
+        with compile_lock:
+            return get_bytecode(shared_cache, script_path)
+
+    ScriptCache.get_bytecode = shared_get_bytecode
+
+    # AppTest는 실행 중에만 global.appTest를 켜고 끝나면 이전 값으로 되돌리므로, 먼저 끝난 세션이
+    # 실행 중인 다른 세션의 옵션을 끄게 됨 (selectbox format_func 등이 저장되지 않음) - 미리 켜 둠
+    config.set_option("global.appTest", True)
+
+
+def _record_busy(retries, waited):
+    target = getattr(_stage_context, "target", None)
+    if target is None:
+        return
+    stats, lock = target
+    with lock:
+        stats["busy"] += retries
+        stats["busy_wait"] += waited
+
+
+def _retry_busy(conn, call, *args):
+    """
+    SQLITE_BUSY(database is locked)이면 연결의 원래 timeout까지 재시도하며 재시도 횟수/대기 시간을 기록
+    SQLite 내장 busy handler와 같은 동작이지만 대기가 앱 밖에서 보이도록 파이썬에서 수행
+    """
+    started = time.perf_counter()
+    retries = 0
+    try:
+        while True:
+            try:
+                return call(*args)
+            except sqlite3.OperationalError as e:
+                busy = "locked" in str(e) or "busy" in str(e)
+                if not busy or time.perf_counter() - started >= conn.busy_timeout:
+                    raise
+                retries += 1
+                time.sleep(BUSY_RETRY_INTERVAL)
+    finally:
+        if retries:
+            _record_busy(retries, time.perf_counter() - started)
+
+
+class BusyCountingCursor(sqlite3.Cursor):
+    def execute(self, *args):
+        return _retry_busy(self.connection, super().execute, *args)
+
+    def executemany(self, *args):
+        return _retry_busy(self.connection, super().executemany, *args)
+
+    def executescript(self, *args):
+        return _retry_busy(self.connection, super().executescript, *args)
+
+
+class BusyCountingConnection(sqlite3.Connection):
+    """락 대기를 직접 재시도하며 집계하는 연결 (sqlite3.connect를 패치해 앱의 모든 연결에 사용)"""
+
+    busy_timeout = 5.0
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or BusyCountingCursor)
+
+    def execute(self, *args):
+        return _retry_busy(self, super().execute, *args)
+
+    def executemany(self, *args):
+        return _retry_busy(self, super().executemany, *args)
+
+    def executescript(self, *args):
+        return _retry_busy(self, super().executescript, *args)
+
+    def commit(self):
+        return _retry_busy(self, super().commit)
+
+
+def count_sqlite_busy():
+    """
+    sqlite3.connect가 BusyCountingConnection을 timeout=0으로 만들도록 패치
+    AppTest는 실행마다 별도 스레드에서 스크립트를 돌리므로 실행을 요청한 스레드의 단계를 넘겨줌
+    """
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    connect = sqlite3.connect
+
+    def counting_connect(database, timeout=5.0, **kwargs):
+        kwargs.setdefault("factory", BusyCountingConnection)
+        conn = connect(database, timeout=0, **kwargs)
+        conn.busy_timeout = timeout
+        return conn
+
+    sqlite3.connect = counting_connect
+
+    init_runner = LocalScriptRunner.__init__
+    run_script_thread = LocalScriptRunner._run_script_thread
+
+    def init_with_stage(self, *args, **kwargs):
+        init_runner(self, *args, **kwargs)
+        self._loadtest_stage = getattr(_stage_context, "target", None)
+
+    def run_script_thread_in_stage(self):
+        _stage_context.target = self._loadtest_stage
+        run_script_thread(self)
+
+    LocalScriptRunner.__init__ = init_with_stage
+    LocalScriptRunner._run_script_thread = run_script_thread_in_stage
+
+
+def write_secrets(work_dir):
+    """작업 디렉토리에 스텁용 .streamlit/secrets.toml 작성 (이미 있으면 그대로 사용)"""
+    path = os.path.join(work_dir, ".streamlit", "secrets.toml")
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for key, value in APP_SECRETS.items():
+            f.write(f"{key} = {json.dumps(value)}\n")
+
+
+def _find(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"위젯을 찾을 수 없습니다: {label}")
+
+
+def _stage_errors(at):
+    """실행 결과에서 오류 메시지를 모음"""
+    return [str(e.value) for e in at.exception] + [str(e.value) for e in at.error]
+
+
+def run_session(app_script, session_id, product_name, timeout, results, lock):
+    """하나의 가상 세션이 검색 → 분석 → 재분석 단계를 순서대로 실행"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app_script, default_timeout=timeout)
+
+    def record(stage, action):
+        _stage_context.target = (results[stage], lock)
+        started = time.perf_counter()
+        try:
+            action()
+            errors = _stage_errors(at)
+        except Exception as e:
+            errors = [str(e)]
+        finally:
+            _stage_context.target = None
+        elapsed = time.perf_counter() - started
+        with lock:
+            results[stage]["latencies"].append(elapsed)
+            results[stage]["errors"] += len(errors)
+        return not errors
+
+    at.run()
+    _find(at.text_input, "제품명 입력").set_value(product_name)
+    # blogads.py는 OpenAI 키를 화면에서 입력받음 (naverblogads.py는 secrets 사용)
+    if any(widget.label == "OpenAI API 키" for widget in at.text_input):
+        _find(at.text_input, "OpenAI API 키").set_value("sk-loadtest")
+
+    if not record("search", lambda: _find(at.button, "검색").click().run()):
+        return
+    if not record("analyze", lambda: _find(at.button, "분석").click().run()):
+        return
+
+    # 기존 분석 결과 화면을 띄운 뒤 재분석 실행
+    at.run()
+    record("reanalyze", lambda: _find(at.button, "재분석 실행").click().run())
+
+
+def run_load(app_script, sessions, workers, products, timeout):
+    results = {stage: {"latencies": [], "errors": 0, "busy": 0, "busy_wait": 0.0} for stage in STAGES}
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_session, app_script, i, f"부하테스트제품{i % products}", timeout, results, lock)
+            for i in range(sessions)
+        ]
+        for future in futures:
+            future.result()
+
+    return results, time.perf_counter() - started
+
+
+def print_report(sessions, workers, results, elapsed):
+    print(f"\n세션 {sessions}개 / 워커 {workers}개 / 총 소요 {elapsed:.2f}s")
+    print(f"{'stage':<10}{'n':>5}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}{'busy':>8}{'wait(s)':>9}")
+    for stage in STAGES:
+        latencies = results[stage]["latencies"]
+        print(
+            f"{stage:<10}{len(latencies):>5}"
+            f"{percentile(latencies, 50):>9.3f}{percentile(latencies, 95):>9.3f}{percentile(latencies, 99):>9.3f}"
+            f"{results[stage]['errors']:>8}{results[stage]['busy']:>8}{results[stage]['busy_wait']:>9.3f}"
+        )
+
+
+def is_saturated(results, p95_limit):
+    """p95 지연시간이 한도를 넘거나 오류가 발생하면 포화 상태로 판단"""
+    for stage in STAGES:
+        if results[stage]["errors"]:
+            return True
+        if percentile(results[stage]["latencies"], 95) > p95_limit:
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="블로그 리뷰 분석 앱 동시 세션 부하 테스트")
+    parser.add_argument("--app", choices=APPS, default=APPS[0], help="부하를 줄 Streamlit 앱 스크립트")
+    parser.add_argument("--sessions", type=int, default=4, help="동시 세션 수")
+    parser.add_argument("--sweep", help="쉼표로 구분한 세션 수 목록 (예: 1,2,4,8). 지정 시 --sessions 무시")
+    parser.add_argument("--workers", type=int, default=4, help="세션을 실행할 워커 스레드 수")
+    parser.add_argument("--products", type=int, default=3, help="세션들이 나눠 검색할 제품 수")
+    parser.add_argument("--api-latency", type=float, default=0.2, help="스텁 API 응답 지연 (초)")
+    parser.add_argument("--p95-limit", type=float, default=5.0, help="포화 판단 기준 p95 지연시간 (초)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="스크립트 1회 실행 제한 시간 (초)")
+    parser.add_argument("--db-dir", help="reviews.db를 둘 작업 디렉토리 (기본: 임시 디렉토리)")
+    args = parser.parse_args()
+
+    check_streamlit_internals()
+    share_streamlit_runtime()
+    count_sqlite_busy()
+    server, base_url = start_stub_server(args.api_latency)
+    os.environ["NAVER_API_BASE_URL"] = f"{base_url}/v1/search/"
+    os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+
+    # 앱은 현재 작업 디렉토리의 data/reviews.db를 사용함
+    os.chdir(args.db_dir or tempfile.mkdtemp(prefix="blogads-loadtest-"))
+    write_secrets(os.getcwd())
+
+    session_counts = [int(n) for n in args.sweep.split(",")] if args.sweep else [args.sessions]
+    print(f"대상 앱: {args.app}")
+    saturation = None
+    for sessions in session_counts:
+        results, elapsed = run_load(os.path.join(APP_DIR, args.app), sessions, args.workers, args.products, args.timeout)
+        print_report(sessions, args.workers, results, elapsed)
+        if saturation is None and is_saturated(results, args.p95_limit):
+            saturation = sessions
+
+    if args.sweep:
+        if saturation is None:
+            print(f"\n포화 지점 없음: 워커 {args.workers}개에서 최대 {session_counts[-1]}개 세션까지 p95 ≤ {args.p95_limit}s")
+        else:
+            print(f"\n포화 지점: 워커 {args.workers}개에서 세션 {saturation}개부터 p95 > {args.p95_limit}s 또는 오류 발생")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,37 @@
 # -*- coding: utf-8 -*-
+import time
+_script_started = time.perf_counter()
+
 import streamlit as st
-import urllib.request
 import urllib.parse
 import json
-import pandas as pd
 import sqlite3
 import os
-from openai import OpenAI
+import threading
+import queue
+import atexit
+import uuid
+from datetime import datetime
+from contextlib import contextmanager
+
+from startup import lazy_import, record_timing, startup_report, timed
+
+from bloggers import init_blogger_tables, record_blogger_post
+from retention import init_retention, start_maintenance, touch_product
+from prefetch import Prefetcher
+from sentiment import quick_sentiment
+from aspects import init_aspect_table, build_aspect_index, get_aspect_index, build_aspect_prompt_text
+from retrieval import HYBRID_SORT, init_retrieval, search_blog
+from history import (
+    ANALYSIS_SECTIONS, init_history, post_set_hash, save_analysis_run,
+    get_latest_analysis, get_analysis_history, diff_analyses
+)
+
+record_timing("모듈 import (streamlit 포함)", time.perf_counter() - _script_started)
+
+# 무거운 모듈은 실제로 사용할 때 import
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
 
 # Secrets 가져오기 (Streamlit Cloud에 등록되어 있어야 함)
 NAVER_CLIENT_ID = st.secrets["NAVER_CLIENT_ID"]
@@ -53,46 +78,126 @@ def init_db():
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     ''')
+    init_aspect_table(c)
+    init_blogger_tables(c)
+    init_retrieval(c)
+    init_history(c)
     conn.commit()
+    init_retention(conn)
+    start_maintenance(db_path)
     return conn, c
 
 # Naver API client 클래스
 class NaverApiClient:
+    DAILY_QUOTA = 25000
+    SESSION_POOL_SIZE = 4
+
     def __init__(self, client_id, client_secret):
         self.client_id = client_id
         self.client_secret = client_secret
-        self.base_url = "https://openapi.naver.com/v1/search/"
+        self.base_url = os.environ.get("NAVER_API_BASE_URL", "https://openapi.naver.com/v1/search/")
+        # requests.Session은 스레드 간 공유가 안전하지 않으므로 요청마다 하나씩 빌려 쓰고 반납
+        # (스크립트 실행 스레드는 재실행마다 바뀌므로 스레드가 아니라 프로세스 단위로 보관)
+        self._sessions = queue.LifoQueue(maxsize=self.SESSION_POOL_SIZE)
+
+        # 일일 호출량 (일반 검색과 미리 검색이 함께 사용)
+        self._quota_lock = threading.Lock()
+        self._quota_day = None
+        self.quota_used = 0
+
+    @contextmanager
+    def session(self):
+        try:
+            session = self._sessions.get_nowait()
+        except queue.Empty:
+            session = requests.Session()
+            session.headers.update({
+                "X-Naver-Client-Id": self.client_id,
+                "X-Naver-Client-Secret": self.client_secret
+            })
+        try:
+            yield session
+        finally:
+            try:
+                self._sessions.put_nowait(session)
+            except queue.Full:
+                session.close()
+
+    def close(self):
+        while True:
+            try:
+                self._sessions.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def consume_quota(self):
+        today = datetime.now().date()
+        with self._quota_lock:
+            if self._quota_day != today:
+                self._quota_day = today
+                self.quota_used = 0
+            if self.quota_used >= self.DAILY_QUOTA:
+                return False
+            self.quota_used += 1
+            return True
+
+    @staticmethod
+    def _report(errors, message):
+        if errors is None:
+            st.error(message)
+        else:
+            errors.append(message)
+
+    def get_data(self, media, count, query, start=1, sort="date", errors=None):
+        if not self.consume_quota():
+            self._report(errors, "네이버 API 일일 호출 한도를 초과했습니다.")
+            return None
 
-    def get_data(self, media, count, query, start=1, sort="date"):
         encText = urllib.parse.quote(query)
         url = f"{self.base_url}{media}?sort={sort}&display={count}&start={start}&query={encText}"
 
-        request = urllib.request.Request(url)
-        request.add_header("X-Naver-Client-Id", self.client_id)
-        request.add_header("X-Naver-Client-Secret", self.client_secret)
-
         try:
-            response = urllib.request.urlopen(request)
-            rescode = response.getcode()
+            with self.session() as session:
+                response = session.get(url, timeout=10)
+            rescode = response.status_code
 
             if rescode == 200:
-                response_body = response.read()
-                return response_body.decode('utf-8')
+                response.encoding = 'utf-8'
+                return response.text
             else:
-                st.error(f"Naver API Error Code: {rescode}")
+                self._report(errors, f"Naver API Error Code: {rescode}")
                 return None
         except Exception as e:
-            st.error(f"Naver API Exception: {e}")
+            self._report(errors, f"Naver API Exception: {e}")
             return None
 
-    def get_blog(self, query, count=10, start=1, sort="date"):
-        return self.get_data("blog", count, query, start, sort)
+    def get_blog(self, query, count=10, start=1, sort="date", errors=None):
+        return self.get_data("blog", count, query, start, sort, errors)
 
     def parse_json(self, data):
         if data:
             return json.loads(data)
         return None
 
+# 재실행/세션 간 공유하는 API 클라이언트
+@st.cache_resource(show_spinner=False)
+def get_naver_client(client_id, client_secret):
+    with timed("네이버 클라이언트 생성"):
+        client = NaverApiClient(client_id, client_secret)
+        atexit.register(client.close)
+        return client
+
+# API 키별로 캐시되므로 최근 사용한 키 몇 개만 유지 (키가 바뀔 때마다 클라이언트가 쌓이지 않도록)
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_openai_client(api_key):
+    with timed("OpenAI 클라이언트 생성"):
+        from openai import OpenAI
+        return OpenAI(api_key=api_key)
+
+@st.cache_resource(show_spinner=False)
+def get_prefetcher():
+    return Prefetcher()
+
 # DB에 블로그 데이터 저장 함수
 def save_blog_data_to_db(conn, cursor, blog_data, product_name):
     if not blog_data or "items" not in blog_data or not blog_data["items"]:
@@ -107,60 +212,57 @@ def save_blog_data_to_db(conn, cursor, blog_data, product_name):
         description = item["description"].replace("<b>", "").replace("</b>", "").replace("&quot;", '"')
 
         cursor.execute('''
-        INSERT INTO blog_posts (product_name, title, description, link, blogger_name, post_date)
-        VALUES (?, ?, ?, ?, ?, ?)
+        INSERT INTO blog_posts (product_name, title, description, link, blogger_name, post_date, fused_rank)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
         ''', (
             product_name,
             title,
             description,
             item.get("link", ""),
             item.get("bloggername", ""),
-            item.get("postdate", "")
+            item.get("postdate", ""),
+            item.get("fused_rank", count + 1)
         ))
+
+        record_blogger_post(
+            cursor,
+            product_name,
+            item.get("bloggername", ""),
+            item.get("link", ""),
+            f"{title} {description}",
+            item.get("postdate", "")
+        )
         count += 1
 
     conn.commit()
     st.success(f"{count}개의 블로그 포스트가 데이터베이스에 저장되었습니다.")
     return count
 
-# DB에서 블로그 포스트 가져오기
-def get_blog_posts(cursor, product_name, limit=50):
-    cursor.execute("""
-    SELECT title, description, blogger_name, post_date, link
-    FROM blog_posts
-    WHERE product_name = ?
-    LIMIT ?
-    """, (product_name, limit))
-    return cursor.fetchall()
-
-# 분석 결과 DB 저장
-def save_analysis_result(conn, cursor, product_name, positive, negative, summary):
-    cursor.execute("DELETE FROM analysis_results WHERE product_name = ?", (product_name,))
-    cursor.execute('''
-    INSERT INTO analysis_results (product_name, positive_opinions, negative_opinions, summary)
-    VALUES (?, ?, ?, ?)
-    ''', (product_name, positive, negative, summary))
-    conn.commit()
+# 검색 결과 저장 및 측면 인덱스/접근 기록 갱신
+def ingest_blog_data(conn, cursor, blog_data, product_name):
+    count = save_blog_data_to_db(conn, cursor, blog_data, product_name)
+    if count:
+        build_aspect_index(conn, cursor, product_name)
+        touch_product(conn, cursor, product_name)
+    return count
 
-# 분석 결과 DB에서 불러오기
-def get_analysis_result(cursor, product_name):
-    cursor.execute("""
-    SELECT positive_opinions, negative_opinions, summary
-    FROM analysis_results
-    WHERE product_name = ?
-    """, (product_name,))
-    return cursor.fetchone()
+# 미리 검색 작업 (API 호출만 수행, DB 저장은 검색 버튼을 눌렀을 때)
+# 결과는 (검색 결과, 오류 메시지 목록) - 실패한 미리 검색도 오류와 함께 넘겨 검색 버튼에서 다시 호출하지 않음
+def make_prefetch(naver_client, product_name, count, sort_option):
+    def fetch(cancelled):
+        parsed_data, errors = search_blog(naver_client, product_name, count, sort_option)
+        if cancelled.is_set():
+            return None
+        return parsed_data, errors
+    return fetch
 
 # ChatGPT API를 이용한 리뷰 분석 함수
 def analyze_reviews(api_key, reviews_text, product_name):
     if not api_key:
         st.error("OpenAI API 키가 필요합니다.")
-        return None, None, None
+        return None, None, None, None
 
     try:
-        import openai
-        openai.api_key = api_key
-
         max_chars = 15000
         if len(reviews_text) > max_chars:
             st.warning(f"리뷰 텍스트가 너무 깁니다. 처음 {max_chars} 문자만 분석합니다.")
@@ -173,6 +275,7 @@ def analyze_reviews(api_key, reviews_text, product_name):
 - 먼저 제공된 글이 광고성 콘텐츠인지 객관적으로 판단해주세요.
 - 판단 기준: 협찬/광고 문구 명시, 지나치게 긍정적인 어조, 구매 링크 다수 포함, 상품 홍보에 치중된 내용 등
 - 광고성 콘텐츠로 판단되면 해당 내용은 의견 분석에서 제외하거나 비중을 낮춰주세요.
+- 작성자에 '광고 의심 블로거'로 표시된 포스트는 여러 제품에 협찬 리뷰를 올린 이력이 있으므로 비중을 낮춰주세요.
 
 2. 긍정적 의견 분석:
 - 실제 사용자가 직접 경험한 구체적인 장점을 중심으로 분석해주세요.
@@ -193,6 +296,9 @@ def analyze_reviews(api_key, reviews_text, product_name):
 - 제품의 주요 특징과 사용자 만족도를 객관적으로 평가해주세요.
 - 5-7줄로 간결하게 요약해주세요.
 
+블로그 내용은 측면(배송, 가격, 맛 등)별로 묶여 있으며, 각 측면의 언급 포스트 수와 대표 포스트가 함께 제공됩니다.
+'가장 자주 언급되는' 특징은 측면별 언급 포스트 수를 기준으로 판단해주세요.
+
 블로그 내용:
 {reviews_text}
 
@@ -205,9 +311,11 @@ def analyze_reviews(api_key, reviews_text, product_name):
 }}
 """
 
-        client = OpenAI(api_key=api_key)
+        client = get_openai_client(api_key)
+        model = "gpt-4o-mini"
+        started = time.perf_counter()
         response = client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=model,
             messages=[
                 {"role": "system", "content": "당신은 제품 리뷰 분석 전문가입니다. 제공된 콘텐츠를 철저히 분석하여 광고성 글을 식별하고, 실제 사용자 경험에 기반한 정보를 추출하는 능력이 있습니다. 분석 시 객관적 근거를 바탕으로 추론하고, 긍정/부정 의견의 패턴을 파악하여 명확하게 구분합니다. 단순 요약이 아닌 심층적 분석을 제공하며, 신뢰할 수 있는 종합 평가를 제시합니다."},
                 {"role": "user", "content": prompt}
@@ -215,24 +323,93 @@ def analyze_reviews(api_key, reviews_text, product_name):
             temperature=0.2,
             max_tokens=2048
         )
+        llm_ms = (time.perf_counter() - started) * 1000
 
         content = response.choices[0].message.content.strip()
 
         if not content:
             st.error("ChatGPT 응답이 비어 있습니다.")
-            return None, None, None
+            return None, None, None, None
 
         try:
             result = json.loads(content)
-            return result["positive"], result["negative"], result["summary"]
+            # 분석 기록용 실행 정보 (모델, 토큰 사용량, 응답 시간)
+            usage = response.usage
+            run = {
+                "model": model,
+                "prompt_tokens": usage.prompt_tokens if usage else None,
+                "completion_tokens": usage.completion_tokens if usage else None,
+                "llm_ms": llm_ms,
+            }
+            return result["positive"], result["negative"], result["summary"], run
         except json.JSONDecodeError as e:
             st.error(f"JSON 파싱 오류 발생: {str(e)}")
             st.text_area("응답 원문 보기", content, height=300)
-            return None, None, None
+            return None, None, None, None
 
     except Exception as e:
         st.error(f"ChatGPT API 호출 중 오류 발생: {str(e)}")
-        return None, None, None
+        return None, None, None, None
+
+# 로컬 감성 미리보기 표시 함수
+def render_sentiment_preview(preview):
+    st.markdown("### ⚡ 빠른 감성 미리보기")
+    st.caption(f"저장된 포스트 {preview['post_count']}개를 감성 사전으로 즉시 분석한 결과입니다.")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("긍정", f"{preview['positive_ratio']:.0%}")
+    col2.metric("부정", f"{preview['negative_ratio']:.0%}")
+    col3.metric("중립", f"{preview['neutral_ratio']:.0%}")
+    col4.metric("광고 추정 비율", f"{preview['ad_share']:.0%}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**자주 나온 긍정 표현**")
+        st.markdown("\n".join(f"- {phrase} ({count})" for phrase, count in preview["top_positive"]) or "-")
+    with col2:
+        st.markdown("**자주 나온 부정 표현**")
+        st.markdown("\n".join(f"- {phrase} ({count})" for phrase, count in preview["top_negative"]) or "-")
+
+# 분석 기록 및 버전 비교 표시 함수 (저장된 결과만 사용하므로 API 호출 없음)
+def render_analysis_history(cursor, product_name):
+    history = get_analysis_history(cursor, product_name)
+    if len(history) < 2:
+        return
+
+    versions = {version["id"]: version for version in history}
+    labels = {
+        version["id"]: f"v{len(history) - i} · {version['created_at']}"
+        for i, version in enumerate(history)
+    }
+
+    with st.expander(f"📜 분석 기록 ({len(history)}개 버전)"):
+        table = "| 버전 | 모델 | 토큰 (입력/출력) | 프롬프트 구성(ms) | LLM 응답(ms) |\n|---|---|---:|---:|---:|\n"
+        table += "\n".join(
+            f"| {labels[version['id']]} | {version['model'] or '-'} "
+            f"| {version['prompt_tokens'] or '-'} / {version['completion_tokens'] or '-'} "
+            f"| {round(version['prompt_ms']) if version['prompt_ms'] is not None else '-'} "
+            f"| {round(version['llm_ms']) if version['llm_ms'] is not None else '-'} |"
+            for version in history
+        )
+        st.markdown(table)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            old_id = st.selectbox("이전 버전", list(versions), index=1, format_func=labels.get, key="history_old")
+        with col2:
+            new_id = st.selectbox("비교 버전", list(versions), index=0, format_func=labels.get, key="history_new")
+
+        diff = diff_analyses(versions[old_id], versions[new_id])
+        notes = {None: "포스트 변경 여부 알 수 없음", True: "분석 대상 포스트 변경됨", False: "같은 포스트로 분석"}
+        caption = f"{notes[diff['posts_changed']]} · 토큰 사용량 변화 {diff['token_delta']:+d}"
+        if diff["model_changed"]:
+            caption += f" · 모델 변경 ({versions[old_id]['model'] or '-'} → {versions[new_id]['model'] or '-'})"
+        st.caption(caption)
+        for key, label in ANALYSIS_SECTIONS:
+            section = diff["sections"][key]
+            st.markdown(f"**{label}** (유사도 {section['similarity']:.0%})")
+            lines = [f"- ➕ {sentence}" for sentence in section["added"]]
+            lines += [f"- ➖ {sentence}" for sentence in section["removed"]]
+            st.markdown("\n".join(lines) or "변경 없음")
 
 # 메인 애플리케이션 함수
 def main():
@@ -244,8 +421,9 @@ def main():
     """, unsafe_allow_html=True)
 
     # DB 연결 및 클라이언트 생성
-    conn, cursor = init_db()
-    naver_client = NaverApiClient(NAVER_CLIENT_ID, NAVER_CLIENT_SECRET)
+    with timed("DB 연결 및 스키마 확인"):
+        conn, cursor = init_db()
+    naver_client = get_naver_client(NAVER_CLIENT_ID, NAVER_CLIENT_SECRET)
 
     # 제품 검색 및 분석 UI
     st.markdown("##")
@@ -261,10 +439,19 @@ def main():
     with col2:
         sort_options = st.selectbox(
             "정렬",
-            options=[("최신순", "date"), ("정확도순", "sim")],
+            options=[("최신순", "date"), ("정확도순", "sim"), ("정확도+최신 혼합", HYBRID_SORT)],
             format_func=lambda x: x[0]
         )
         sort_option = sort_options[1]
+        quick_mode = st.checkbox("빠른 분석 모드 (LLM 미사용)", value=False)
+
+    # 프롬프트 압축 설정
+    with st.sidebar:
+        st.subheader("프롬프트 압축")
+        compaction = {
+            "enabled": st.checkbox("잡음 제거 (이모지, 반복 문자, 인사말, 해시태그)", value=True),
+            "tabular": st.checkbox("표 형식 인코딩", value=True)
+        }
 
     # 검색 및 분석 버튼 배치
     with col1:
@@ -274,14 +461,36 @@ def main():
         with analyze_col:
             analyze_button = st.button("분석")
 
+    # 입력이 멈추면 백그라운드에서 미리 검색
+    prefetcher = get_prefetcher()
+    session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+    search_key = (product_name, count, sort_option)
+    if not product_name:
+        prefetcher.cancel(session_id)
+    elif (
+        not search_button
+        and search_key != st.session_state.get("prefetch_key")
+        and product_name != st.session_state.get("current_product")
+    ):
+        prefetcher.schedule(session_id, search_key, make_prefetch(naver_client, *search_key))
+        st.session_state.prefetch_key = search_key
+
     # 검색 처리
     if search_button and product_name:
+        st.session_state.prefetch_key = search_key
         with st.spinner(f"'{product_name}'에 대한 네이버 블로그 검색 중..."):
-            data = naver_client.get_blog(product_name, count, sort=sort_option)
-            parsed_data = naver_client.parse_json(data)
+            prefetched = prefetcher.take(search_key)
+            if prefetched is not None:
+                parsed_data, errors = prefetched
+                if parsed_data and parsed_data.get("items"):
+                    st.success(f"미리 검색된 {len(parsed_data['items'])}개의 블로그 포스트를 사용합니다.")
+            else:
+                parsed_data, errors = search_blog(naver_client, product_name, count, sort_option)
+            for error in errors:
+                st.error(error)
 
             if parsed_data and "items" in parsed_data and parsed_data["items"]:
-                save_blog_data_to_db(conn, cursor, parsed_data, product_name)
+                ingest_blog_data(conn, cursor, parsed_data, product_name)
 
                 st.subheader(f"검색 결과 (총 {parsed_data['total']}개 중 {len(parsed_data['items'])}개 표시)")
 
@@ -311,10 +520,32 @@ def main():
         st.markdown(f"**'{st.session_state.current_product}'** 에 대한 블로그 리뷰를 분석합니다.")
         st.markdown("---")
 
-        existing_analysis = get_analysis_result(cursor, st.session_state.current_product)
-
-        if existing_analysis and not st.session_state.get("reanalyze", False):
-            positive, negative, summary = existing_analysis
+        # 위젯 조작으로 인한 재실행마다 쓰지 않도록 분석/재분석 실행 시에만 갱신
+        if analyze_button or st.session_state.get("reanalyze", False):
+            touch_product(conn, cursor, st.session_state.current_product)
+
+        # 측면별 언급 빈도 (로컬 인덱스)
+        aspect_index = get_aspect_index(cursor, st.session_state.current_product)
+        if not aspect_index:
+            aspect_index = build_aspect_index(conn, cursor, st.session_state.current_product)
+        if aspect_index:
+            st.markdown("### 🧩 측면별 언급 빈도")
+            st.bar_chart(pd.DataFrame(
+                {"언급 포스트 수": [entry["post_count"] for entry in aspect_index]},
+                index=[entry["aspect"] for entry in aspect_index]
+            ))
+
+        existing_analysis = get_latest_analysis(cursor, st.session_state.current_product)
+
+        if quick_mode:
+            # 빠른 분석 모드: 로컬 감성 분석 결과만 표시
+            preview = quick_sentiment(cursor, st.session_state.current_product)
+            if preview:
+                render_sentiment_preview(preview)
+            else:
+                st.warning(f"'{st.session_state.current_product}'에 대한 블로그 포스트가 없습니다. 먼저 검색을 실행해주세요.")
+        elif existing_analysis and not st.session_state.get("reanalyze", False):
+            positive, negative, summary = existing_analysis["positive"], existing_analysis["negative"], existing_analysis["summary"]
 
             st.subheader("기존 분석 결과")
             col1, col2 = st.columns(2)
@@ -332,22 +563,37 @@ def main():
 
             if st.button("재분석 실행"):
                 st.session_state["reanalyze"] = True
-                st.experimental_rerun()
+                st.rerun()
 
         else:
-            with st.spinner("리뷰 데이터 분석 중..."):
-                blog_posts = get_blog_posts(cursor, st.session_state.current_product)
+            # LLM 응답 전까지 로컬 감성 미리보기 표시
+            preview_placeholder = st.empty()
+            preview = quick_sentiment(cursor, st.session_state.current_product)
+            if preview:
+                with preview_placeholder.container():
+                    render_sentiment_preview(preview)
 
-                if blog_posts:
-                    all_posts_text = "\n\n".join([
-                        f"제목: {post[0]}\n내용: {post[1]}\n작성자: {post[2]}\n날짜: {post[3]}"
-                        for post in blog_posts
-                    ])
-
-                    positive, negative, summary = analyze_reviews(OPENAI_API_KEY, all_posts_text, st.session_state.current_product)
+            with st.spinner("리뷰 데이터 분석 중..."):
+                if any(entry["representative_ids"] for entry in aspect_index):
+                    prompt_started = time.perf_counter()
+                    all_posts_text, token_stats = build_aspect_prompt_text(cursor, aspect_index, compaction)
+                    prompt_ms = (time.perf_counter() - prompt_started) * 1000
+                    # LLM 응답을 기다리는 동안 다른 세션이 포스트를 바꿀 수 있으므로 미리 계산
+                    posts_hash = post_set_hash(cursor, st.session_state.current_product)
+                    st.caption(
+                        f"프롬프트 압축: 약 {token_stats['raw_tokens']} → {token_stats['compact_tokens']} 토큰 "
+                        f"({token_stats['saved_tokens']} 토큰, {token_stats['saved_ratio']:.0%} 절감)"
+                    )
+
+                    positive, negative, summary, run = analyze_reviews(OPENAI_API_KEY, all_posts_text, st.session_state.current_product)
 
                     if positive and negative and summary:
-                        save_analysis_result(conn, cursor, st.session_state.current_product, positive, negative, summary)
+                        preview_placeholder.empty()
+                        save_analysis_run(conn, cursor, st.session_state.current_product, positive, negative, summary, {
+                            **run,
+                            "post_set_hash": posts_hash,
+                            "prompt_ms": prompt_ms,
+                        })
 
                         st.subheader("리뷰 분석 결과")
                         col1, col2 = st.columns(2)
@@ -369,6 +615,9 @@ def main():
                 else:
                     st.warning(f"'{st.session_state.current_product}'에 대한 블로그 포스트가 없습니다. 먼저 검색을 실행해주세요.")
 
+        # 분석 기록 비교 (저장된 데이터만 사용)
+        render_analysis_history(cursor, st.session_state.current_product)
+
     # DB 연결 종료
     conn.close()
 
@@ -393,6 +642,13 @@ def main():
             </div>
             """, unsafe_allow_html=True)
 
+    # 시작/초기화 비용 보고
+    with st.sidebar:
+        with st.expander("⏱️ 시작 시간"):
+            report = "| 항목 | 시간(ms) |\n|---|---:|\n"
+            report += "\n".join(f"| {row['항목']} | {row['시간(ms)']} |" for row in startup_report(_script_started))
+            st.markdown(report)
+
 if __name__ == "__main__":
     # 세션 상태 초기화
     if "reanalyze" not in st.session_state:
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+PREFETCH_DELAY = 1.0   # 입력이 이 시간(초) 동안 바뀌지 않으면 미리 검색 시작
+PREFETCH_TTL = 300     # 아직 사용하지 않은 미리 검색 결과를 보관하는 시간(초)
+
+
+class PrefetchJob:
+    def __init__(self, key, fetch):
+        self.key = key
+        self.fetch = fetch
+        self.sessions = set()
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self.started = False
+        self.result = None
+        self.error = None
+        self.finished_at = None
+        self.timer = None
+
+    def is_stale(self, ttl):
+        if self.cancelled.is_set() or self.error is not None:
+            return True
+        return self.finished_at is not None and time.time() - self.finished_at > ttl
+
+
+class Prefetcher:
+    """
+    검색어 입력이 멈추면 백그라운드에서 검색 API 호출을 미리 수행하는 프로세스 공용 작업 관리자
+
+    - 같은 (검색어, 개수, 정렬) 요청은 세션이 달라도 하나의 작업으로 합침
+    - 세션이 다른 검색어를 입력하면 아직 시작하지 않은 이전 작업은 취소
+    - 실제 API 호출은 fetch 함수 안에서 일반 검색과 같은 클라이언트(같은 호출 한도)를 사용
+    - 결과는 take로 한 번만 꺼내 쓸 수 있음 (DB 저장은 꺼낸 쪽에서 수행)
+    """
+
+    def __init__(self, delay=PREFETCH_DELAY, ttl=PREFETCH_TTL):
+        self.delay = delay
+        self.ttl = ttl
+        self._jobs = {}
+        self._session_keys = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, session_id, key, fetch):
+        """
+        세션의 현재 검색어로 미리 검색 예약 (debounce)
+        fetch(cancelled)는 취소 이벤트를 받아 검색을 수행하고 결과를 반환해야 함
+        """
+        with self._lock:
+            if self._session_keys.get(session_id) == key and key in self._jobs:
+                return
+            self._release(session_id)
+            self._prune()
+
+            job = self._jobs.get(key)
+            if job is None or job.is_stale(self.ttl):
+                job = PrefetchJob(key, fetch)
+                job.timer = threading.Timer(self.delay, self._run, args=(job,))
+                job.timer.daemon = True
+                job.timer.start()
+                self._jobs[key] = job
+
+            job.sessions.add(session_id)
+            self._session_keys[session_id] = key
+
+    def cancel(self, session_id):
+        with self._lock:
+            self._release(session_id)
+
+    def _release(self, session_id):
+        """
+        세션의 이전 예약을 해제하고, 아무도 기다리지 않는 작업은 취소
+        이미 실행 중인 작업은 fetch가 취소 이벤트를 확인해 저장 단계를 건너뜀
+        """
+        key = self._session_keys.pop(session_id, None)
+        job = self._jobs.get(key)
+        if job is None:
+            return
+        job.sessions.discard(session_id)
+        if not job.sessions and not job.done.is_set():
+            job.timer.cancel()
+            job.cancelled.set()
+            del self._jobs[key]
+
+    def _run(self, job):
+        with self._lock:
+            if job.cancelled.is_set():
+                return
+            job.started = True
+        try:
+            job.result = job.fetch(job.cancelled)
+        except Exception as e:
+            job.error = e
+        finally:
+            job.finished_at = time.time()
+            job.done.set()
+
+    def take(self, key, timeout=30):
+        """
+        검색 버튼을 눌렀을 때 호출
+        작업을 목록에서 꺼내므로 결과는 한 번만 사용됨 (다음 검색은 다시 API 호출)
+        진행 중인 작업은 끝날 때까지 기다려 결과를 반환하고, 아직 시작 전이면 취소 후 None 반환 (직접 검색)
+        API 오류로 실패한 검색은 fetch가 결과에 오류를 담아 반환하므로 호출한 쪽에서 표시하고 다시 호출하지 않음
+        """
+        with self._lock:
+            job = self._jobs.pop(key, None)
+            if job is None or job.is_stale(self.ttl):
+                return None
+            if not job.started:
+                job.timer.cancel()
+                job.cancelled.set()
+                return None
+
+        if not job.done.wait(timeout) or job.error is not None:
+            return None
+        return job.result
+
+    def _prune(self):
+        """재사용 시간이 지난 완료 작업 정리"""
+        for key in [key for key, job in self._jobs.items() if job.done.is_set() and job.is_stale(self.ttl)]:
+            del self._jobs[key]
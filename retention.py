@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+import threading
+import time
+
+# 보존 정책
+POST_TTL_DAYS = 90           # 마지막 검색 후 이 기간이 지난 블로그 포스트 삭제
+ANALYSIS_TTL_DAYS = 365      # 이 기간이 지난 이전 분석 버전 삭제 (제품별 최신 분석은 유지)
+MAX_ANALYSIS_VERSIONS = 20   # 제품별로 보관하는 분석 버전 수 (최신 포함)
+BLOGGER_TTL_DAYS = 180       # 포스트가 모두 삭제된 뒤 이 기간 동안 다시 보이지 않은 블로거 기록 삭제
+MAX_DB_BYTES = 200 * 1024 * 1024  # 실제 데이터 크기 상한 (초과 시 오래 접근하지 않은 제품부터 제거)
+VACUUM_PAGES = 500           # 정리 1회당 파일에서 반환할 최대 페이지 수
+MAINTENANCE_INTERVAL = 600   # 백그라운드 정리 주기 (초)
+
+# 제품 단위로 함께 지우는 테이블
+PRODUCT_TABLES = ["blog_posts", "analysis_results", "aspect_index", "product_access"]
+
+_maintenance_thread = None
+_maintenance_lock = threading.Lock()
+
+
+# 보존 정책용 테이블/인덱스 생성 (incremental auto_vacuum 전환은 백그라운드 정리 스레드에서)
+def init_retention(conn):
+    c = conn.cursor()
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS product_access (
+        product_name TEXT PRIMARY KEY,
+        last_accessed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_product_access_last ON product_access (last_accessed_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_blog_posts_product ON blog_posts (product_name)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_blog_posts_created ON blog_posts (created_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_blog_posts_link ON blog_posts (link)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_blogger_posts_blogger ON blogger_posts (blogger_name)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_analysis_results_created ON analysis_results (created_at)")
+    conn.commit()
+
+
+def enable_incremental_vacuum(conn):
+    """
+    auto_vacuum을 INCREMENTAL로 전환 (DB마다 최초 1회)
+    모드 변경은 전체 VACUUM을 거쳐야 적용되어 오래 걸리므로 사용자 요청 스레드가 아니라 정리 스레드에서 수행
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return
+    try:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    except sqlite3.OperationalError:
+        # 다른 세션이 사용 중이면 다음 정리 때 다시 시도
+        pass
+
+
+# 제품 접근 시각 갱신 (LRU 기준)
+def touch_product(conn, cursor, product_name):
+    cursor.execute('''
+    INSERT INTO product_access (product_name, last_accessed_at)
+    VALUES (?, CURRENT_TIMESTAMP)
+    ON CONFLICT(product_name) DO UPDATE SET last_accessed_at = CURRENT_TIMESTAMP
+    ''', (product_name,))
+    conn.commit()
+
+
+def _live_bytes(cursor):
+    """빈 페이지를 제외한 실제 데이터 크기"""
+    page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+    page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+    freelist_count = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+    return (page_count - freelist_count) * page_size
+
+
+def evict_product(cursor, product_name):
+    for table in PRODUCT_TABLES:
+        cursor.execute(f"DELETE FROM {table} WHERE product_name = ?", (product_name,))
+
+
+def expire_old_rows(cursor, post_ttl_days=POST_TTL_DAYS, analysis_ttl_days=ANALYSIS_TTL_DAYS,
+                    max_analysis_versions=MAX_ANALYSIS_VERSIONS, blogger_ttl_days=BLOGGER_TTL_DAYS):
+    """
+    TTL이 지난 포스트, 오래되었거나 보관 수를 넘은 이전 분석 버전,
+    포스트가 모두 사라진 제품의 파생 데이터(측면 인덱스, 접근 기록), 오래된 블로거 기록 삭제
+    제품별 최신 분석은 나중에 다시 분석했을 때 비교할 수 있도록 TTL과 무관하게 유지 (용량 초과 시에만 제거)
+    """
+    cursor.execute(
+        "DELETE FROM blog_posts WHERE created_at < datetime('now', ?)",
+        (f"-{post_ttl_days} days",)
+    )
+    expired = cursor.rowcount
+    cursor.execute("""
+    DELETE FROM analysis_results
+    WHERE created_at < datetime('now', ?)
+    AND id NOT IN (SELECT MAX(id) FROM analysis_results GROUP BY product_name)
+    """, (f"-{analysis_ttl_days} days",))
+    expired += cursor.rowcount
+    cursor.execute("""
+    DELETE FROM analysis_results
+    WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY product_name ORDER BY id DESC) AS version_rank
+            FROM analysis_results
+        )
+        WHERE version_rank > ?
+    )
+    """, (max_analysis_versions,))
+    expired += cursor.rowcount
+
+    for table in ("aspect_index", "product_access"):
+        cursor.execute(f"""
+        DELETE FROM {table}
+        WHERE product_name NOT IN (SELECT DISTINCT product_name FROM blog_posts)
+        """)
+        expired += cursor.rowcount
+    return expired + expire_bloggers(cursor, blogger_ttl_days)
+
+
+def expire_bloggers(cursor, ttl_days=BLOGGER_TTL_DAYS):
+    """
+    블로거 평판 기록 정리
+    포스트가 더 이상 저장되어 있지 않고 ttl_days 동안 다시 검색되지 않은 링크를 지우고,
+    남은 링크가 없으며 같은 기간 동안 갱신되지 않은 블로거와 제품 목록을 삭제
+    (남아 있는 블로거의 통계는 누적값 그대로 유지)
+    """
+    cutoff = f"-{ttl_days} days"
+    cursor.execute("""
+    DELETE FROM blogger_posts
+    WHERE COALESCE(seen_at, 0) < datetime('now', ?)
+    AND NOT EXISTS (SELECT 1 FROM blog_posts WHERE blog_posts.link = blogger_posts.link)
+    """, (cutoff,))
+    expired = cursor.rowcount
+    cursor.execute("""
+    DELETE FROM bloggers
+    WHERE COALESCE(updated_at, 0) < datetime('now', ?)
+    AND NOT EXISTS (SELECT 1 FROM blogger_posts WHERE blogger_posts.blogger_name = bloggers.blogger_name)
+    """, (cutoff,))
+    expired += cursor.rowcount
+    cursor.execute("""
+    DELETE FROM blogger_products
+    WHERE blogger_name NOT IN (SELECT blogger_name FROM bloggers)
+    """)
+    return expired + cursor.rowcount
+
+
+def evict_to_size(cursor, max_bytes=MAX_DB_BYTES):
+    """데이터 크기가 상한 이하가 될 때까지 가장 오래 접근하지 않은 제품부터 삭제"""
+    if _live_bytes(cursor) <= max_bytes:
+        return []
+
+    # 접근 기록이 없는 제품은 가장 오래된 것으로 취급 (포스트 없이 분석 기록만 남은 제품 포함)
+    cursor.execute("""
+    SELECT p.product_name
+    FROM (
+        SELECT product_name FROM blog_posts
+        UNION
+        SELECT product_name FROM analysis_results
+    ) AS p
+    LEFT JOIN product_access AS a ON a.product_name = p.product_name
+    ORDER BY a.last_accessed_at IS NOT NULL, a.last_accessed_at
+    """)
+    evicted = []
+    for (product_name,) in cursor.fetchall():
+        if _live_bytes(cursor) <= max_bytes:
+            break
+        evict_product(cursor, product_name)
+        evicted.append(product_name)
+    return evicted
+
+
+def incremental_vacuum(conn, pages=VACUUM_PAGES):
+    """
+    빈 페이지를 최대 pages개까지 파일에서 반환 (0이면 전부, 짧게 끝나므로 다른 세션을 오래 막지 않음)
+    execute()는 한 단계만 실행되어 페이지 1개만 반환되므로 executescript()로 끝까지 실행
+    """
+    conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+
+
+# 보존 정책 1회 적용
+def run_maintenance(conn):
+    enable_incremental_vacuum(conn)
+    cursor = conn.cursor()
+    expired = expire_old_rows(cursor, POST_TTL_DAYS, ANALYSIS_TTL_DAYS, MAX_ANALYSIS_VERSIONS, BLOGGER_TTL_DAYS)
+    evicted = evict_to_size(cursor, MAX_DB_BYTES)
+    conn.commit()
+    incremental_vacuum(conn, VACUUM_PAGES)
+    return {"expired_rows": expired, "evicted_products": evicted}
+
+
+def _maintenance_loop(db_path, interval):
+    conn = sqlite3.connect(db_path, timeout=30)
+    while True:
+        try:
+            run_maintenance(conn)
+        except sqlite3.Error:
+            conn.rollback()
+        time.sleep(interval)
+
+
+# 프로세스당 하나의 백그라운드 정리 스레드 시작 (이미 실행 중이면 무시)
+def start_maintenance(db_path, interval=MAINTENANCE_INTERVAL):
+    global _maintenance_thread
+    with _maintenance_lock:
+        if _maintenance_thread is not None and _maintenance_thread.is_alive():
+            return
+        _maintenance_thread = threading.Thread(
+            target=_maintenance_loop,
+            args=(db_path, interval),
+            name="reviews-db-maintenance",
+            daemon=True
+        )
+        _maintenance_thread.start()
+
+
+# 파일을 지우지 않고 모든 데이터를 비움 (다른 세션의 열린 연결은 그대로 유효)
+def reset_database(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+    for (table,) in cursor.fetchall():
+        cursor.execute(f"DELETE FROM {table}")
+    conn.commit()
+    incremental_vacuum(conn, pages=0)
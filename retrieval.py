@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+HYBRID_SORT = "hybrid"
+HYBRID_ORDERINGS = ["sim", "date"]  # 정확도순, 최신순
+RECENCY_DECAYED = {"sim"}           # 최신성 가중치를 적용할 정렬 (최신순은 순위 자체가 이미 최신성)
+RRF_K = 60                          # 순위 융합 상수 (클수록 하위 순위와의 점수 차가 작아짐)
+RECENCY_HALF_LIFE_DAYS = 90         # 최신성 가중치가 절반으로 줄어드는 기간
+RECENCY_FLOOR = 0.9                 # 오래된 포스트도 융합 점수의 이 비율은 유지 (비슷한 순위끼리만 순서를 바꾸는 정도)
+
+
+# blog_posts에 융합 순위 컬럼 추가 (기존 DB 호환)
+def init_retrieval(cursor):
+    cursor.execute("PRAGMA table_info(blog_posts)")
+    if "fused_rank" not in [row[1] for row in cursor.fetchall()]:
+        try:
+            cursor.execute("ALTER TABLE blog_posts ADD COLUMN fused_rank INTEGER")
+        except sqlite3.OperationalError as e:
+            # 동시에 연결한 다른 세션이 먼저 추가한 경우
+            if "duplicate column" not in str(e):
+                raise
+
+
+def recency_weight(post_date, today=None, half_life=RECENCY_HALF_LIFE_DAYS):
+    """작성일(YYYYMMDD) 기준 최신성 가중치 (RECENCY_FLOOR ~ 1.0), 날짜를 알 수 없으면 RECENCY_FLOOR"""
+    try:
+        posted = datetime.strptime(post_date, "%Y%m%d").date()
+    except (TypeError, ValueError):
+        return RECENCY_FLOOR
+    age_days = max(((today or date.today()) - posted).days, 0)
+    return RECENCY_FLOOR + (1 - RECENCY_FLOOR) * 0.5 ** (age_days / half_life)
+
+
+def fuse_results(result_sets, today=None, k=RRF_K):
+    """
+    정렬별 검색 결과({정렬: 결과 목록})를 하나의 순위로 합침
+
+    점수 = Σ 1 / (k + 정렬별 순위) × (정확도순이면 최신성 가중치)
+    최신순 순위는 이미 최신성을 반영하므로 가중치를 다시 곱하지 않음 (이중 반영 방지)
+    두 정렬 모두에 등장한 포스트가 앞으로 오고, 정확도순 안에서는 최근 포스트가 우선
+    link 기준으로 중복을 제거하며 각 항목에 fused_rank(1부터)와 fused_score를 추가해 반환
+    """
+    scores, items = {}, {}
+    for sort, results in result_sets.items():
+        for rank, item in enumerate(results, start=1):
+            link = item.get("link", "")
+            score = 1.0 / (k + rank)
+            if sort in RECENCY_DECAYED:
+                score *= recency_weight(item.get("postdate"), today)
+            scores[link] = scores.get(link, 0.0) + score
+            items.setdefault(link, item)
+
+    fused = []
+    for link, item in items.items():
+        fused.append({**item, "fused_score": scores[link]})
+    fused.sort(key=lambda item: -item["fused_score"])
+    for rank, item in enumerate(fused, start=1):
+        item["fused_rank"] = rank
+    return fused
+
+
+def fetch_hybrid(naver_client, query, count, errors):
+    """
+    정확도순/최신순 결과를 동시에 가져와 융합한 상위 count개 (네이버 API 응답과 같은 형식)
+    작업 스레드에서는 화면에 출력할 수 없으므로 API 오류는 errors 목록에 모아 호출한 쪽에서 표시
+    """
+    def fetch(sort):
+        sort_errors = []
+        response = naver_client.parse_json(naver_client.get_blog(query, count, sort=sort, errors=sort_errors))
+        return response, sort_errors
+
+    with ThreadPoolExecutor(max_workers=len(HYBRID_ORDERINGS)) as executor:
+        results = dict(zip(HYBRID_ORDERINGS, executor.map(fetch, HYBRID_ORDERINGS)))
+
+    responses = {}
+    for sort, (response, sort_errors) in results.items():
+        errors.extend(sort_errors)
+        if response and response.get("items"):
+            responses[sort] = response
+    if not responses:
+        return None
+    return {
+        "total": max(response.get("total", 0) for response in responses.values()),
+        "items": fuse_results({sort: response["items"] for sort, response in responses.items()})[:count],
+    }
+
+
+# 정렬 옵션에 따라 블로그 검색 (hybrid는 두 정렬을 융합)
+def search_blog(naver_client, query, count, sort):
+    """반환값: (검색 결과, 오류 메시지 목록) - 오류는 메인 스레드에서 표시해야 함"""
+    errors = []
+    if sort == HYBRID_SORT:
+        return fetch_hybrid(naver_client, query, count, errors), errors
+    return naver_client.parse_json(naver_client.get_blog(query, count, sort=sort, errors=errors)), errors
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import re
+from collections import Counter
+
+from startup import lazy_import
+from bloggers import DOWNWEIGHT_REPUTATION, get_blogger_reputation, is_sponsored
+
+np = lazy_import("numpy")
+
+# 감성 사전 (어간 -> 가중치)
+POSITIVE_LEXICON = {
+    "좋": 1.0, "만족": 1.5, "추천": 1.0, "맛있": 1.5, "최고": 1.5, "편하": 1.0, "편리": 1.0,
+    "빠르": 1.0, "빨라": 1.0, "예쁘": 1.0, "이쁘": 1.0, "튼튼": 1.0, "가성비": 1.0, "저렴": 1.0,
+    "깔끔": 1.0, "부드럽": 0.5, "촉촉": 0.5, "재구매": 1.5, "친절": 1.0, "훌륭": 1.5, "괜찮": 0.5,
+    "[부정없음]": 0.5,
+}
+NEGATIVE_LEXICON = {
+    "별로": 1.5, "아쉽": 1.0, "아쉬": 1.0, "불편": 1.5, "실망": 1.5, "비싸": 1.0, "늦": 1.0,
+    "느리": 1.0, "느려": 1.0, "불량": 1.5, "고장": 1.5, "짜요": 0.5, "짜다": 0.5, "짜서": 0.5, "질기": 1.0,
+    "냄새": 0.5, "환불": 1.0, "최악": 2.0, "불친절": 1.5, "문제": 1.0, "단점": 1.0, "후회": 1.5,
+    "맛없": 1.5, "[부정]": 1.5,
+}
+
+# 긍정 표현을 부정하는 구문은 미리 '[부정]' 토큰으로 바꿔 긍정으로 집계되지 않게 함
+_NEGATED_POSITIVE = re.compile(r"(?:안|못)\s?(?:좋|편하|편리|예쁘|맛있)\S*|(?:좋|만족스럽|추천하|편하)지\s?(?:않|못)\S*|추천\s?안\S*")
+# 부정 표현을 부정하는 구문(문제없이, 별로 안 비싸요 등)은 '[부정없음]' 토큰으로 바꿔 약한 긍정으로 집계
+_NEGATED_NEGATIVE = re.compile(
+    r"(?:별로\s?)?(?:안|못)\s?(?:비싸|불편|아쉽|아쉬|짜|느리|느려|늦|질기)\S*"
+    r"|(?:비싸|불편하?|아쉽|짜|느리|늦|질기)지\s?(?:않|않아)\S*"
+    r"|(?:문제|불량|고장|단점|냄새|후회)\s?(?:없|않)\S*"
+)
+
+_TERMS = list(POSITIVE_LEXICON) + list(NEGATIVE_LEXICON)
+_TERM_INDEX = {term: i for i, term in enumerate(_TERMS)}
+# 긴 용어를 먼저 시도해 겹치는 용어는 가장 긴 것 하나만 집계 (불친절 → 친절로 중복 집계하지 않음)
+_TERM_PATTERN = re.compile("|".join(re.escape(term) for term in sorted(_TERMS, key=len, reverse=True)))
+_WORD_PATTERN = re.compile(r"\S+")
+
+
+def _normalize(text):
+    text = _NEGATED_NEGATIVE.sub(" [부정없음] ", text)
+    return _NEGATED_POSITIVE.sub(" [부정] ", text)
+
+
+def _count_terms(text):
+    row = [0] * len(_TERMS)
+    for match in _TERM_PATTERN.finditer(text):
+        row[_TERM_INDEX[match.group(0)]] += 1
+    return row
+
+
+def score_posts(texts):
+    """
+    포스트별 감성 점수 계산
+    사전 용어 출현 횟수 행렬(포스트 x 용어)과 가중치 벡터의 곱으로 한 번에 계산
+    """
+    normalized = [_normalize(text) for text in texts]
+    counts = np.array([_count_terms(text) for text in normalized], dtype=np.float32).reshape(len(texts), len(_TERMS))
+    weights = np.array(
+        list(POSITIVE_LEXICON.values()) + [-w for w in NEGATIVE_LEXICON.values()],
+        dtype=np.float32
+    )
+    return counts @ weights if len(texts) else np.zeros(0, dtype=np.float32), counts, normalized
+
+
+def _top_phrases(normalized, terms, limit):
+    """용어가 집계된 위치의 어절과 앞 어절을 구문으로 모아 빈도순으로 반환 (치환 토큰은 제외)"""
+    terms = {term for term in terms if not term.startswith("[")}
+    phrases = Counter()
+    for text in normalized:
+        words = [word for word in _WORD_PATTERN.finditer(text) if not word.group(0).startswith("[")]
+        for match in _TERM_PATTERN.finditer(text):
+            if match.group(0) not in terms:
+                continue
+            for i, word in enumerate(words):
+                if word.start() <= match.start() < word.end():
+                    phrases[" ".join(w.group(0) for w in words[max(i - 1, 0):i + 1])] += 1
+                    break
+    return phrases.most_common(limit)
+
+
+# 저장된 포스트로 즉시 감성 미리보기 계산 (LLM 호출 없음)
+def quick_sentiment(cursor, product_name, limit=5):
+    cursor.execute("""
+    SELECT title, description, blogger_name
+    FROM blog_posts
+    WHERE product_name = ?
+    """, (product_name,))
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+
+    texts = [f"{title} {description or ''}" for title, description, _ in rows]
+    scores, _, normalized = score_posts(texts)
+
+    positive = int((scores > 0.5).sum())
+    negative = int((scores < -0.5).sum())
+    total = len(rows)
+
+    reputations = {}
+    ads = 0
+    for (_, _, blogger_name), text in zip(rows, texts):
+        if blogger_name not in reputations:
+            reputations[blogger_name] = get_blogger_reputation(cursor, blogger_name)
+        if is_sponsored(text) or reputations[blogger_name] < DOWNWEIGHT_REPUTATION:
+            ads += 1
+
+    return {
+        "post_count": total,
+        "positive_ratio": positive / total,
+        "negative_ratio": negative / total,
+        "neutral_ratio": (total - positive - negative) / total,
+        "ad_share": ads / total,
+        "top_positive": _top_phrases(normalized, list(POSITIVE_LEXICON), limit),
+        "top_negative": _top_phrases(normalized, list(NEGATIVE_LEXICON), limit),
+    }
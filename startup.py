@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+
+# 프로세스 전체에서 처음 한 번 발생한 초기화 비용 (라벨 -> 초)
+STARTUP_TIMINGS = {}
+_timings_lock = threading.Lock()
+
+
+def record_timing(label, seconds):
+    """처음 기록된 값(콜드 비용)만 유지"""
+    with _timings_lock:
+        STARTUP_TIMINGS.setdefault(label, seconds)
+
+
+@contextmanager
+def timed(label):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(label, time.perf_counter() - started)
+
+
+class LazyModule:
+    """
+    속성에 처음 접근할 때 모듈을 import하는 프록시
+    사용하지 않는 화면에서는 무거운 모듈(pandas, openai 등)을 불러오지 않아 첫 화면이 빨라짐
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            with timed(f"import {self._name}"):
+                self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+def startup_report(script_started=None):
+    """시작/초기화 비용 표 (이번 실행 경과 시간 포함)"""
+    with _timings_lock:
+        rows = [{"항목": label, "시간(ms)": round(seconds * 1000, 1)} for label, seconds in STARTUP_TIMINGS.items()]
+    if script_started is not None:
+        rows.append({"항목": "이번 실행", "시간(ms)": round((time.perf_counter() - script_started) * 1000, 1)})
+    return rows